@@ -0,0 +1,59 @@
+"""Per-access cost of reading and writing component fields on an entity.
+
+Run from the repository root with::
+
+    $ python -m benchmarks.entity_access
+"""
+import timeit
+
+from universe import engine
+
+
+def linear_scan_getattr(entity, name):
+    # The resolution strategy Entity used before fields became per-type descriptors, kept for comparison.
+    for component in entity._components.values():
+        for field in component._fields.values():
+            if name == field.data_name:
+                return entity.__dict__.get(name)
+            if name == field.name:
+                return field.from_data(entity.__dict__)
+    return entity.__dict__[name]
+
+
+def linear_scan_setattr(entity, name, value):
+    for component in entity._components.values():
+        for field in component._fields.values():
+            if name in (field.data_name, field.name):
+                entity.__dict__[field.data_name] = field.to_data(value)
+                return
+    entity.__dict__[name] = value
+
+
+def main(number=200_000):
+    state = {
+        'turn': 2500, 'width': 1000, 'seq': 3,
+        'entities': [
+            {'pk': 0, 'type': 'species', 'name': 'Human', 'plural_name': 'Humans', 'growth_rate': 15,
+             'gravity_immune': True, 'temperature_immune': True, 'radiation_immune': True},
+            {'pk': 1, 'type': 'planet', 'x': 480, 'y': 235, 'gravity': 50, 'temperature': 50, 'radiation': 50,
+             'ironium_conc': 50, 'boranium_conc': 50, 'germanium_conc': 50, 'owner_id': 0, 'population': 1000},
+        ]
+    }
+    S = engine.GameState(state, {})
+    planet = S.manager.get_entity('metadata', 1)
+
+    # 'x' is declared by the first component of a planet, 'population' by the last.
+    for name in ('x', 'population', 'owner_id'):
+        before = timeit.timeit(lambda: linear_scan_getattr(planet, name), number=number)
+        after = timeit.timeit(lambda: getattr(planet, name), number=number)
+        print(f"get {name:<12} linear scan: {before / number * 1e9:7.1f} ns   "
+              f"current: {after / number * 1e9:7.1f} ns")
+
+    before = timeit.timeit(lambda: linear_scan_setattr(planet, 'population', 1000), number=number)
+    after = timeit.timeit(lambda: setattr(planet, 'population', 1000), number=number)
+    print(f"set {'population':<12} linear scan: {before / number * 1e9:7.1f} ns   "
+          f"current: {after / number * 1e9:7.1f} ns")
+
+
+if __name__ == '__main__':
+    main()
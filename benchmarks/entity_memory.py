@@ -0,0 +1,49 @@
+"""Bytes per entity for a universe of planets under each entity storage mode.
+
+Run from the repository root with::
+
+    $ python -m benchmarks.entity_memory
+"""
+import gc
+import random
+import tracemalloc
+
+from universe import components, engine
+
+
+def make_state(count):
+    random.seed(0)
+    entities = [
+        {'pk': 0, 'type': 'species', 'name': 'Human', 'plural_name': 'Humans', 'growth_rate': 15,
+         'gravity_immune': True, 'temperature_immune': True, 'radiation_immune': True},
+    ]
+    for pk in range(1, count + 1):
+        planet = {'pk': pk, 'type': 'planet', 'x': random.randint(0, 999), 'y': random.randint(0, 999)}
+        planet.update(components.EnvironmentComponent.random())
+        planet.update(components.MineralConcentrationComponent.random())
+        if pk % 10 == 0:
+            planet.update(owner_id=0, population=1000, ironium=20, boranium=30, germanium=40)
+        entities.append(planet)
+    return {'turn': 2500, 'width': 1000, 'seq': count + 1, 'entities': entities}
+
+
+def measure(storage, state):
+    gc.collect()
+    tracemalloc.start()
+    S = engine.GameState(state, {}, storage=storage)
+    gc.collect()
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del S
+    return size
+
+
+def main(count=100_000):
+    state = make_state(count)
+    for storage in engine.Manager.STORAGE_TYPES:
+        size = measure(storage, state)
+        print(f"{storage:<10} {size / count:8.1f} bytes per planet")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""Peak memory of writing out the next turn, building the whole state against streaming it.
+
+Run from the repository root with::
+
+    $ python -m benchmarks.export_memory
+"""
+import gc
+import json
+import os
+import tracemalloc
+
+from universe import engine
+
+from .entity_memory import make_state
+
+
+def peak(write, state):
+    S = engine.GameState(state, {})
+    gc.collect()
+    tracemalloc.start()
+    with open(os.devnull, 'w') as fp:
+        write(S, fp)
+    _size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main(count=100_000):
+    state = make_state(count)
+    for label, write in [
+        ('generate + json.dump', lambda S, fp: json.dump(S.generate(), fp)),
+        ('generate_to', lambda S, fp: S.generate_to(fp)),
+        ('generate_to, lines', lambda S, fp: S.generate_to(fp, lines=True)),
+    ]:
+        print(f"{label:<22} {peak(write, state) / 2**20:8.1f} MiB peak")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Loading a universe of planets into columnar storage from JSON against mapping a saved file.
+
+Run from the repository root with::
+
+    $ python -m benchmarks.mapped_load
+"""
+import json
+import os
+import tempfile
+import time
+
+from universe import engine, mapped
+
+from .entity_memory import make_state
+
+
+def main(count=100_000):
+    state = make_state(count)
+    text = json.dumps(state)
+    S = engine.GameState(json.loads(text), {}, storage='columnar')
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'state.map')
+        with open(path, 'wb') as fp:
+            mapped.write_state(fp, S.old, S.manager)
+
+        start = time.perf_counter()
+        engine.GameState(json.loads(text), {}, storage='columnar')
+        json_load = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with open(path, 'rb') as fp:
+            S = engine.GameState(mapped.read_state(fp), {}, storage='columnar')
+        mapped_load = time.perf_counter() - start
+        del S  # release the mapping before the file is removed
+
+        print(f"json     {len(text) / 2**20:7.2f} MiB   load: {json_load * 1e3:7.1f} ms")
+        print(f"mapped   {os.path.getsize(path) / 2**20:7.2f} MiB   load: {mapped_load * 1e3:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Turn generation on a single process against turn generation sharded across a process pool.
+
+Run from the repository root with::
+
+    $ python -m benchmarks.parallel_turn
+"""
+import copy
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from universe import engine
+
+
+def universe(planets=200_000, fleets=2_000, seed=0):
+    rng = random.Random(seed)
+    entities = [
+        {'pk': 0, 'type': 'species', 'name': 'Human', 'plural_name': 'Humans', 'growth_rate': 15,
+         'gravity_immune': False, 'gravity_min': 20, 'gravity_max': 80,
+         'temperature_immune': False, 'temperature_min': 15, 'temperature_max': 85,
+         'radiation_immune': True},
+    ]
+    pk = 1
+    for _ in range(planets):
+        entities.append({
+            'pk': pk, 'type': 'planet', 'x': rng.randrange(1000), 'y': rng.randrange(1000),
+            'gravity': rng.randrange(101), 'temperature': rng.randrange(101), 'radiation': rng.randrange(101),
+            'ironium_conc': 50, 'boranium_conc': 50, 'germanium_conc': 50,
+            'owner_id': 0, 'population': rng.randrange(1000, 1_000_000),
+        })
+        pk += 1
+    ships = list(range(pk, pk + fleets))
+    for ship in ships:
+        entities.append({'pk': ship, 'type': 'ship', 'x': rng.randrange(1000), 'y': rng.randrange(1000)})
+    pk += fleets
+    # Pair the fleets off into small pursuit groups, so that every group is simulated step by step.
+    for i, ship in enumerate(ships):
+        target = ships[i ^ 1] if i ^ 1 < len(ships) else ships[0]
+        entities.append({'pk': pk, 'type': 'movement_order', 'actor_id': ship, 'seq': 0,
+                         'target_id': target, 'warp': rng.randrange(4, 11)})
+        pk += 1
+    return {'turn': 2500, 'width': 1000, 'seq': pk, 'entities': entities}
+
+
+def generate(state, executor=None):
+    start = time.perf_counter()
+    results = engine.GameState(copy.deepcopy(state), {}).generate(executor=executor)
+    return results, time.perf_counter() - start
+
+
+def main():
+    state = universe()
+    expected, elapsed = generate(state)
+    print(f"serial        {elapsed:6.2f} s")
+
+    workers = 2
+    while True:
+        workers = min(workers, os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results, elapsed = generate(state, executor)
+        assert results == expected, "sharded turn differs from the serial one"
+        print(f"{workers:2d} processes  {elapsed:6.2f} s")
+        if workers >= (os.cpu_count() or 1):
+            break
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""Planet values for a species across every planet, one entity at a time against a single bulk scan.
+
+Run from the repository root with::
+
+    $ python -m benchmarks.planet_values
+"""
+import time
+
+from universe import engine, utils
+
+from .entity_memory import make_state
+
+
+def main(count=100_000):
+    state = make_state(count)
+    state['entities'][0].update(gravity_immune=False, gravity_min=20, gravity_max=80,
+                                temperature_immune=False, temperature_min=15, temperature_max=85)
+    for storage in engine.Manager.STORAGE_TYPES:
+        S = engine.GameState(state, {}, storage=storage)
+        species = S.manager.get_entity('species', 0)
+
+        start = time.perf_counter()
+        expected = {
+            planet.pk: utils.environment_value(utils.tolerances(species), utils.environment(planet))
+            for planet in S.manager.get_entities('environment').values()
+        }
+        before = time.perf_counter() - start
+
+        start = time.perf_counter()
+        values = utils.planet_values(species, S.manager)
+        after = time.perf_counter() - start
+
+        assert values == expected
+        print(f"{storage:<10} per entity: {before * 1e3:7.1f} ms   bulk: {after * 1e3:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Building every player's view of a turn, filtering the full state per player against a single pass.
+
+Run from the repository root with::
+
+    $ python -m benchmarks.player_views
+"""
+import copy
+import time
+from collections import defaultdict
+
+from universe import engine, views
+
+from .entity_memory import make_state
+
+
+def filter_view(state, player, scan_range=views.SCAN_RANGE):
+    # What a host has to do without views: a pass over the whole state for each player.
+    entities = state['entities']
+    owners = {entity['pk']: entity.get('owner_id') for entity in entities}
+    grid = defaultdict(list)
+    for entity in entities:
+        if 'x' in entity and entity.get('owner_id') == player:
+            grid[entity['x'] // scan_range, entity['y'] // scan_range].append((entity['x'], entity['y']))
+
+    def visible(entity):
+        if 'x' in entity:
+            if entity.get('owner_id') == player:
+                return True
+            column, row = entity['x'] // scan_range, entity['y'] // scan_range
+            return any(
+                (entity['x'] - x) ** 2 + (entity['y'] - y) ** 2 <= scan_range ** 2
+                for i in (column - 1, column, column + 1)
+                for j in (row - 1, row, row + 1)
+                for x, y in grid.get((i, j), ())
+            )
+        if 'actor_id' in entity:
+            return owners.get(entity['actor_id']) == player
+        return True
+
+    return dict(state, entities=[entity for entity in entities if visible(entity)])
+
+
+def main(count=100_000, players=8):
+    state = make_state(count)
+    species = state['entities'][0]
+    state['entities'][1:1] = [dict(species, pk=count + 1 + n, name=f'Species {n}') for n in range(1, players)]
+    state['seq'] += players
+    for planet in state['entities'][players:]:
+        if 'owner_id' in planet:
+            planet['owner_id'] = [0, *range(count + 2, count + players + 1)][planet['pk'] // 10 % players]
+
+    for storage in engine.Manager.STORAGE_TYPES:
+        S = engine.GameState(copy.deepcopy(state), {}, storage=storage)
+        start = time.perf_counter()
+        new = S.generate()
+        expected = {player: filter_view(new, player) for player in S.manager.get_pks('species')}
+        before = time.perf_counter() - start
+
+        S = engine.GameState(copy.deepcopy(state), {}, storage=storage)
+        start = time.perf_counter()
+        result = S.generate_views()
+        after = time.perf_counter() - start
+
+        assert result == expected
+        print(f"{storage:<10} per player: {before:6.2f} s   single pass: {after:6.2f} s")
+
+
+if __name__ == '__main__':
+    main()
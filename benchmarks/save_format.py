@@ -0,0 +1,37 @@
+"""Size and speed of saving and loading a universe of planets as JSON and in the binary format.
+
+Run from the repository root with::
+
+    $ python -m benchmarks.save_format
+"""
+import json
+import time
+
+from universe import binary, engine
+
+from .entity_memory import make_state
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main(count=100_000):
+    S = engine.GameState(make_state(count), {})
+    state = S.generate()
+
+    text, json_save = timed(json.dumps, state)
+    data, binary_save = timed(binary.dumps, state, S.manager)
+    loaded, json_load = timed(json.loads, text)
+    decoded, binary_load = timed(binary.loads, data)
+    assert decoded == loaded == state
+
+    for label, size, save, load in [('json', len(text.encode('utf-8')), json_save, json_load),
+                                    ('binary', len(data), binary_save, binary_load)]:
+        print(f"{label:<8} {size / 2**20:7.2f} MiB   save: {save * 1e3:7.1f} ms   load: {load * 1e3:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Radius, nearest and rectangle queries against the manager's spatial index and a scan of every entity.
+
+Run from the repository root with::
+
+    $ python -m benchmarks.spatial_queries
+"""
+import random
+import time
+
+from universe import components, engine
+
+
+QUERIES = 20
+
+
+def make_manager(count, width):
+    manager = engine.Manager(width=width)
+    manager.register_entity_type('ship', [components.PositionComponent()])
+    engine.Entity.register_manager(manager)
+    for pk in range(count):
+        manager.register_entity({'pk': pk, 'type': 'ship', 'x': random.randrange(width), 'y': random.randrange(width)})
+    return manager
+
+
+def scan(manager, x, y, radius, x0, y0, x1, y1):
+    entities = manager.get_entities('position').values()
+    within = [entity for entity in entities if (entity.x - x) ** 2 + (entity.y - y) ** 2 <= radius ** 2]
+    nearest = min(entities, key=lambda entity: ((entity.x - x) ** 2 + (entity.y - y) ** 2, entity.pk))
+    rectangle = [entity for entity in entities if x0 <= entity.x <= x1 and y0 <= entity.y <= y1]
+    return within, [nearest], rectangle
+
+
+def query(manager, x, y, radius, x0, y0, x1, y1):
+    index = manager.spatial
+    return index.within(x, y, radius), index.nearest(x, y), index.rectangle(x0, y0, x1, y1)
+
+
+def main(counts=(10_000, 100_000, 1_000_000), width=1000):
+    random.seed(0)
+    for count in counts:
+        manager = make_manager(count, width)
+        queries = []
+        for _ in range(QUERIES):
+            x, y = random.randrange(width), random.randrange(width)
+            queries.append((x, y, 50, x - 25, y - 25, x + 25, y + 25))
+
+        timings = []
+        for method in (scan, query):
+            start = time.perf_counter()
+            results = [method(manager, *args) for args in queries]
+            timings.append((time.perf_counter() - start) / QUERIES)
+        print(f"{count:>9} entities   scan: {timings[0] * 1e3:8.2f} ms   index: {timings[1] * 1e3:6.2f} ms per query")
+
+        assert [[sorted(entity.pk for entity in found) for found in result] for result in results] == \
+            [[sorted(entity.pk for entity in found) for found in scan(manager, *args)] for args in queries]
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+"""Time to import and validate a universe of planets under each entity storage mode.
+
+Run from the repository root with::
+
+    $ python -m benchmarks.state_load
+"""
+import time
+
+from universe import engine
+
+from .entity_memory import make_state
+
+
+def main(count=100_000):
+    state = make_state(count)
+    for storage in engine.Manager.STORAGE_TYPES:
+        start = time.perf_counter()
+        S = engine.GameState(state, {}, storage=storage)
+        load = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for entity in S.manager.get_entities('metadata').values():
+            entity.validate()
+        validate = time.perf_counter() - start
+
+        start = time.perf_counter()
+        S.manager.validate_entities()
+        batch = time.perf_counter() - start
+
+        print(f"{storage:<10} load: {load * 1e3:7.1f} ms   validation per entity: {validate * 1e3:7.1f} ms   "
+              f"by component: {batch * 1e3:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+import io
+import json
+import unittest
+
+from universe import binary, engine
+
+
+class BinaryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.state = {
+            'turn': 2500, 'width': 1000, 'seq': 6,
+            'entities': [
+                {'pk': 0, 'type': 'species', 'name': 'Human', 'plural_name': 'Humans', 'growth_rate': 15,
+                 'gravity_immune': False, 'gravity_min': 32, 'gravity_max': 86,
+                 'temperature_immune': True, 'radiation_immune': True},
+                {'pk': 1, 'type': 'planet', 'x': 480, 'y': 235, 'gravity': 50, 'temperature': 50,
+                 'radiation': 50, 'ironium_conc': 50, 'boranium_conc': 50, 'germanium_conc': 50,
+                 'owner_id': 0, 'population': 123_456_789},
+                {'pk': 2, 'type': 'planet', 'x': 10, 'y': 999, 'gravity': 1, 'temperature': 99,
+                 'radiation': 0, 'ironium_conc': 5, 'boranium_conc': 6, 'germanium_conc': 7},
+                {'pk': 3, 'type': 'ship', 'x': -70_000, 'y': 2, 'owner_id': 0, 'population': 2000},
+                {'pk': 5, 'type': 'movement_order', 'actor_id': 3, 'seq': 0, 'x_t': 10, 'y_t': 2, 'warp': 5},
+            ]
+        }
+        self.S = engine.GameState(json.loads(json.dumps(self.state)), {})
+
+    def test_round_trip(self):
+        results = self.S.generate()
+        data = binary.dumps(results, self.S.manager)
+
+        self.assertEqual(binary.loads(data), results)
+        self.assertEqual(json.dumps(binary.loads(data)), json.dumps(results))
+        self.assertLess(len(data), len(json.dumps(results)))
+
+    def test_files(self):
+        fp = io.BytesIO()
+        binary.write_state(fp, self.state, self.S.manager)
+        fp.seek(0)
+
+        self.assertEqual(binary.read_state(fp), self.state)
+
+    def test_game_state(self):
+        expected = self.S.generate()
+        state = binary.loads(binary.dumps(self.state, self.S.manager))
+
+        self.assertEqual(engine.GameState(state, {}).generate(), expected)
+
+    def test_unexpected_values(self):
+        # Values that do not fit their field's column type are still written and read back exactly.
+        self.state['entities'][1].update(population=2**70, x=True)
+        self.state['entities'][2].update(pk=-4, ironium_conc='a')
+
+        self.assertEqual(binary.loads(binary.dumps(self.state, self.S.manager)), self.state)
+
+    def test_empty(self):
+        state = {'turn': 1, 'entities': []}
+        self.assertEqual(binary.loads(binary.dumps(state, self.S.manager)), state)
+
+    def test_unknown_fields(self):
+        self.state['entities'][3]['color'] = 'red'
+        with self.assertRaises(ValueError):
+            binary.dumps(self.state, self.S.manager)
+
+        self.state['entities'][3] = {'pk': 3, 'type': 'starbase'}
+        with self.assertRaises(ValueError):
+            binary.dumps(self.state, self.S.manager)
+
+    def test_not_binary(self):
+        with self.assertRaises(ValueError):
+            binary.loads(json.dumps(self.state).encode('utf-8'))
@@ -0,0 +1,84 @@
+import unittest
+from decimal import Decimal
+
+from universe import columns, components, fields
+
+
+class ColumnTestCase(unittest.TestCase):
+    def test_absent(self):
+        column = columns.Column()
+        column.extend(2)
+
+        self.assertIsNone(column.get(0))
+        self.assertEqual(column.get(0, 'missing'), 'missing')
+        with self.assertRaises(KeyError):
+            column.discard(0)
+
+    def test_none_is_a_value(self):
+        column = columns.Column()
+        column.extend(1)
+
+        column.set(0, None)
+        self.assertEqual(column.get(0, 'missing'), None)
+        column.discard(0)
+        self.assertEqual(column.get(0, 'missing'), 'missing')
+
+
+class TypedColumnTestCase(unittest.TestCase):
+    def test_packed(self):
+        column = columns.TypedColumn()
+        column.extend(3)
+
+        column.set(0, 12)
+        column.set(2, -7)
+        self.assertEqual(column.take([0, 2]), [12, -7])
+        self.assertEqual(column.take([0, 1, 2]), [12, None, -7])
+        self.assertEqual(column.objects, {})
+
+    def test_objects(self):
+        column = columns.TypedColumn()
+        column.extend(4)
+
+        column.set(0, 'a')
+        column.set(1, True)
+        column.set(2, 2 ** 70)
+        column.set(3, Decimal('1.5'))
+        self.assertEqual(column.take([0, 1, 2, 3]), ['a', True, 2 ** 70, Decimal('1.5')])
+        self.assertIs(column.get(1), True)
+
+        column.set(0, 5)
+        self.assertEqual(column.get(0), 5)
+        self.assertNotIn(0, column.objects)
+
+    def test_boolean(self):
+        column = columns.BooleanColumn()
+        column.extend(2)
+
+        column.set(0, False)
+        column.set(1, True)
+        self.assertIs(column.get(0), False)
+        self.assertEqual(column.take([0, 1]), [False, True])
+
+
+class ComponentTableTestCase(unittest.TestCase):
+    def test_columns(self):
+        table = columns.ComponentTable(components.OwnershipComponent())
+        self.assertEqual(list(table.columns), ['owner_id'])
+        self.assertIsInstance(table.columns['owner_id'], columns.TypedColumn)
+
+        table = columns.ComponentTable(components.MetadataComponent())
+        self.assertNotIsInstance(table.columns['pk'], columns.TypedColumn)
+
+    def test_rows(self):
+        table = columns.ComponentTable(components.PositionComponent())
+        table.extend(4)
+        table.live[1] = table.live[3] = 1
+
+        self.assertEqual(len(table), 4)
+        self.assertEqual(len(table.columns['x']), 4)
+        self.assertEqual(table.rows(), [1, 3])
+
+    def test_column_for(self):
+        self.assertIsInstance(columns.column_for(fields.BooleanField()), columns.BooleanColumn)
+        self.assertIsInstance(columns.column_for(fields.IntField()), columns.TypedColumn)
+        self.assertIsInstance(columns.column_for(fields.CharField()), columns.Column)
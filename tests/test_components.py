@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import unittest
+from unittest import mock
 
 from universe import components, fields, engine, exceptions
 
@@ -48,6 +49,41 @@ class ComponentTestCase(unittest.TestCase):
             self.SpecialComponent().validate({'foo': 42, 'bar': 12})
         self.assertEqual(str(e.exception), "Only one of 'foo' or 'bar' can be set.")
 
+    def test_inherited_hook(self):
+        class SubComponent(self.SpecialComponent):
+            baz = fields.IntField(required=False)
+
+            def validate_baz(self, data):
+                if data.get('baz') == 0:
+                    raise exceptions.ValidationError("'baz' may not be zero.")
+
+        # Only the subclass's own fields are validated by its compiled validator.
+        self.assertIsNone(SubComponent._validate_fields(SubComponent(), {'bar': 3}))
+        with self.assertRaises(exceptions.ValidationError) as e:
+            SubComponent().validate({'foo': 42, 'baz': 0})
+        self.assertEqual(str(e.exception), "'baz' may not be zero.")
+
+    def test_validate_rows(self):
+        class CheckedComponent(components.Component):
+            foo = fields.IntField(required=False)
+            bar = fields.IntField(required=False)
+
+            def check(self, data, manager):
+                if ('foo' in data) == ('bar' in data):
+                    raise exceptions.ValidationError("Only one of 'foo' or 'bar' can be set.")
+
+        component = CheckedComponent()
+        with self.assertRaises(exceptions.ValidationError):
+            component.validate({})
+
+        # Rows passing the column checks only go through check, not through every field again.
+        rows = [{'foo': 42}, {'foo': 42, 'bar': 12}, {'bar': 'a'}]
+        with mock.patch.object(CheckedComponent, '_validate_fields', side_effect=AssertionError):
+            self.assertEqual(component.validate_rows(rows), [
+                (2, "'bar' must be an integer."),
+                (1, "Only one of 'foo' or 'bar' can be set."),
+            ])
+
 
 class MetadataComponentTestCase(unittest.TestCase):
     def setUp(self):
@@ -0,0 +1,90 @@
+import copy
+import tempfile
+import unittest
+
+from universe import deltas, engine, mapped
+
+
+class DeltaTestCase(unittest.TestCase):
+    def setUp(self):
+        planet = {'type': 'planet', 'gravity': 50, 'temperature': 50, 'radiation': 50,
+                  'ironium_conc': 50, 'boranium_conc': 50, 'germanium_conc': 50}
+        self.state = {
+            'turn': 2500, 'width': 1000, 'seq': 12,
+            'entities': [
+                {'pk': 0, 'type': 'species', 'name': 'Human', 'plural_name': 'Humans', 'growth_rate': 15,
+                 'gravity_immune': True, 'temperature_immune': True, 'radiation_immune': True},
+                dict(planet, pk=1, x=100, y=100, x_prev=100, y_prev=100, owner_id=0, population=1000),
+                dict(planet, pk=2, x=200, y=200, x_prev=200, y_prev=200),
+                dict(planet, pk=3, x=300, y=300, x_prev=300, y_prev=300, owner_id=0, population=5_000_000),
+                dict(planet, pk=4, x=400, y=400, x_prev=400, y_prev=400, owner_id=0, population=0),
+                {'pk': 5, 'type': 'ship', 'x': 500, 'y': 500, 'x_prev': 500, 'y_prev': 500, 'owner_id': 0},
+                {'pk': 6, 'type': 'ship', 'x': 600, 'y': 600, 'x_prev': 600, 'y_prev': 600, 'owner_id': 0},
+                {'pk': 7, 'type': 'ship', 'x': 700, 'y': 700, 'x_prev': 700, 'y_prev': 700, 'owner_id': 0},
+                {'pk': 8, 'type': 'movement_order', 'actor_id': 5, 'seq': 0, 'x_t': 510, 'y_t': 500, 'warp': 5},
+                {'pk': 9, 'type': 'movement_order', 'actor_id': 5, 'seq': 1, 'x_t': 900, 'y_t': 900, 'warp': 5},
+                {'pk': 10, 'type': 'movement_order', 'actor_id': 6, 'seq': 0, 'x_t': 0, 'y_t': 0, 'warp': 1},
+            ]
+        }
+        self.updates = {
+            0: [
+                {'action': 'create', 'type': 'movement_order', 'actor_id': 7, 'seq': 0,
+                 'target_id': 2, 'warp': 9},
+                {'action': 'delete', 'actor_id': 6, 'seq': 0},
+            ],
+        }
+
+    def generate(self, storage, delta):
+        S = engine.GameState(copy.deepcopy(self.state), copy.deepcopy(self.updates), storage=storage)
+        return S.generate_delta() if delta else S.generate()
+
+    def test_apply(self):
+        for storage in engine.Manager.STORAGE_TYPES:
+            expected = self.generate(storage, delta=False)
+            delta = self.generate(storage, delta=True)
+
+            self.assertEqual(deltas.apply(self.state, delta), expected, storage)
+
+    def test_changes(self):
+        delta = self.generate('dict', delta=True)
+
+        self.assertEqual([entity['pk'] for entity in delta['created']], [12])
+        # The order for pk 8 is reached over the turn, and that for pk 10 is deleted by its player.
+        self.assertEqual(sorted(delta['removed']), [8, 10])
+        # Stationary objects, and planets whose population does not change, are left out.
+        modified = {change['pk']: change for change in delta['modified']}
+        self.assertEqual(sorted(modified), [1, 3, 4, 5, 7, 9])
+        self.assertEqual(modified[4], {'pk': 4, 'set': {}, 'unset': ['owner_id', 'population']})
+        self.assertEqual(modified[9]['set'], {'seq': 0})
+        self.assertEqual(modified[5]['set'], {'x': 510})
+
+    def test_successive_turns(self):
+        state = self.state
+        for _ in range(3):
+            expected = engine.GameState(copy.deepcopy(state), {}).generate()
+            state = deltas.apply(state, engine.GameState(copy.deepcopy(state), {}).generate_delta())
+            self.assertEqual(state, expected)
+
+    def test_two_games(self):
+        # Creating a second game must not take over the change tracking of the first.
+        for storage in engine.Manager.STORAGE_TYPES:
+            A = engine.GameState(copy.deepcopy(self.state), copy.deepcopy(self.updates), storage=storage)
+            B = engine.GameState(copy.deepcopy(self.state), copy.deepcopy(self.updates), storage=storage)
+
+            delta = A.generate_delta()
+            self.assertTrue(delta['modified'], storage)
+            self.assertEqual(deltas.apply(self.state, delta)['entities'], A.manager.export_data()['entities'], storage)
+            self.assertEqual(deltas.apply(self.state, delta), B.generate(), storage)
+
+    def test_two_games_validation(self):
+        # Each game's references and orders are checked against its own entities, not the last game's.
+        other = dict(self.state, entities=[entity for entity in self.state['entities'] if entity['pk'] == 2])
+        for storage in engine.Manager.STORAGE_TYPES:
+            A = engine.GameState(copy.deepcopy(self.state), {}, storage=storage)
+            B = engine.GameState(copy.deepcopy(other), {}, storage=storage)
+
+            self.assertEqual(A.manager.validate_entities(), [], storage)
+            self.assertEqual(B.manager.validate_entities(), [], storage)
+            if storage == 'columnar':
+                with tempfile.TemporaryFile() as fp:
+                    mapped.write_state(fp, A.old, A.manager)
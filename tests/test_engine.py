@@ -1,6 +1,9 @@
+import copy
 import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest import mock
 
-from universe import engine, exceptions
+from universe import engine, exceptions, systems
 
 
 class EntityTestCase(unittest.TestCase):
@@ -33,6 +36,201 @@ class EntityTestCase(unittest.TestCase):
 
         self.assertEqual(str(e.exception), "'owner_id' is not an existing entity.")
 
+    def test_batch_validation(self):
+        planet = {
+            'type': 'planet', 'x': 300, 'y': 600, 'gravity': 27, 'temperature': 36, 'radiation': 45,
+            'ironium_conc': 67, 'boranium_conc': 78, 'germanium_conc': 82,
+        }
+        state = {
+            'turn': 2500, 'width': 1000, 'seq': 4,
+            'entities': [
+                dict(planet, pk=1),
+                dict(planet, pk=2, gravity=200, owner_id=0, population=1000),
+                dict(planet, pk=3, x='a', ironium_conc=-1),
+            ]
+        }
+
+        with self.assertRaises(exceptions.ValidationErrors) as e:
+            engine.GameState(state, {}, batch=True)
+
+        self.assertEqual(sorted(e.exception.errors), [
+            (2, 'environment', "'gravity' must be less than or equal to 100."),
+            (2, 'ownership', "'owner_id' is not an existing entity."),
+            (3, 'mineral_concentrations', "'ironium_conc' must be greater than or equal to 0."),
+            (3, 'position', "'x' must be an integer."),
+        ])
+
+        state['entities'] = [dict(planet, pk=1)]
+        for storage in engine.Manager.STORAGE_TYPES:
+            S = engine.GameState(state, {}, storage=storage, batch=True)
+            self.assertEqual(S.manager.validate_entities(), [])
+
+    def test_reference_validation(self):
+        state = {
+            'turn': 2500, 'width': 1000, 'seq': 5,
+            'entities': [
+                {'pk': 1, 'type': 'planet', 'x': 300, 'y': 600, 'gravity': 27, 'temperature': 36, 'radiation': 45,
+                 'ironium_conc': 67, 'boranium_conc': 78, 'germanium_conc': 82},
+                {'pk': 2, 'type': 'ship', 'x': 300, 'y': 600},
+                {'pk': 3, 'type': 'movement_order', 'actor_id': 1, 'seq': 0, 'x_t': 0, 'y_t': 0, 'warp': 5},
+                {'pk': 4, 'type': 'movement_order', 'actor_id': 2, 'seq': 0, 'target_id': 9, 'warp': 5},
+            ]
+        }
+
+        with self.assertRaises(exceptions.ValidationErrors) as e:
+            engine.GameState(state, {}, batch=True)
+
+        self.assertEqual(e.exception.errors, [
+            (3, 'movement_orders', "The acting object must be a ship."),
+            (4, 'movement_orders', "'target_id' is not an existing entity."),
+        ])
+
+    def test_type_index(self):
+        state = {'turn': 2500, 'width': 1000, 'seq': 3, 'entities': [
+            {'pk': 1, 'type': 'ship', 'x': 300, 'y': 600},
+            {'pk': 2, 'type': 'ship', 'x': 300, 'y': 600},
+        ]}
+        S = engine.GameState(state, {})
+
+        self.assertEqual(S.manager.get_pks('ship'), {1, 2})
+        self.assertEqual(S.manager.get_pks('planet'), set())
+
+        S.manager.unregister_entity(S.manager.get_entity('metadata', 1))
+        self.assertEqual(S.manager.get_pks('ship'), {2})
+
+    def test_entity_class(self):
+        state = {'turn': 2500, 'width': 1000, 'entities': []}
+        S = engine.GameState(state, {})
+
+        cls = S.manager.get_entity_class('planet')
+        self.assertTrue(issubclass(cls, engine.Entity))
+        self.assertIs(cls._fields['owner'], cls._fields['owner_id'])
+        self.assertEqual(cls._fields['owner'].data_name, 'owner_id')
+        self.assertNotIn('actor', cls._fields)
+
+        planet = engine.Entity(type='planet', x=1, y=2)
+        self.assertIsInstance(planet, cls)
+        self.assertIsNone(planet.population)
+        with self.assertRaises(AttributeError):
+            planet.actor
+
+    def test_outlives_game(self):
+        # Entities can still be written once their game has been garbage collected.
+        state = {'turn': 2500, 'width': 1000, 'seq': 3, 'entities': [{'pk': 2, 'type': 'ship', 'x': 300, 'y': 600}]}
+        for storage in engine.Manager.STORAGE_TYPES:
+            ship = engine.GameState(copy.deepcopy(state), {}, storage=storage).manager.get_entity('metadata', 2)
+            ship.x = 5
+            del ship.y
+            self.assertEqual((ship.x, ship.y), (5, None), storage)
+
+
+class CompactStorageTestCase(unittest.TestCase):
+    def setUp(self):
+        state = {
+            'turn': 2500, 'width': 1000, 'seq': 2,
+            'entities': [
+                {
+                    'pk': 0,
+                    'type': 'species',
+                    'name': 'Human',
+                    'plural_name': 'Humans',
+                    'growth_rate': 15,
+                    'gravity_immune': True,
+                    'temperature_immune': True,
+                    'radiation_immune': True,
+                },
+                {'pk': 1, 'type': 'ship', 'x': 480, 'y': 235, 'owner_id': 0},
+            ]
+        }
+        self.S = engine.GameState(state, {}, storage='compact')
+
+    def test_declared_fields_in_slots(self):
+        ship = self.S.manager.get_entity('metadata', 1)
+
+        self.assertIsInstance(ship, engine.CompactEntity)
+        self.assertEqual((ship.x, ship.y), (480, 235))
+        self.assertIsNone(ship.population)
+        self.assertEqual(ship.owner.pk, 0)
+        self.assertEqual(ship.serialize(), {'pk': 1, 'type': 'ship', 'x': 480, 'y': 235, 'owner_id': 0})
+
+    def test_overflow_attributes(self):
+        ship = self.S.manager.get_entity('metadata', 1)
+        self.assertFalse(hasattr(ship, 'dx'))
+
+        ship.dx = 5
+        self.assertEqual(ship.dx, 5)
+        self.assertEqual(ship.__dict__, {'dx': 5})
+        self.assertNotIn('dx', ship.serialize())
+
+    def test_delete_field(self):
+        ship = self.S.manager.get_entity('metadata', 1)
+
+        ship.owner = None
+        self.assertIsNone(ship.owner_id)
+        self.assertEqual(ship.serialize(), {'pk': 1, 'type': 'ship', 'x': 480, 'y': 235})
+        with self.assertRaises(AttributeError):
+            del ship.owner_id
+
+    def test_unsupported_storage(self):
+        with self.assertRaises(ValueError):
+            engine.Manager(storage='bogus')
+
+
+class ColumnarStorageTestCase(unittest.TestCase):
+    def setUp(self):
+        state = {
+            'turn': 2500, 'width': 1000, 'seq': 3,
+            'entities': [
+                {
+                    'pk': 0,
+                    'type': 'species',
+                    'name': 'Human',
+                    'plural_name': 'Humans',
+                    'growth_rate': 15,
+                    'gravity_immune': True,
+                    'temperature_immune': True,
+                    'radiation_immune': True,
+                },
+                {'pk': 1, 'type': 'ship', 'x': 480, 'y': 235, 'owner_id': 0},
+                {'pk': 2, 'type': 'ship', 'x': 460, 'y': 215},
+            ]
+        }
+        self.S = engine.GameState(state, {}, storage='columnar')
+
+    def test_entity_view(self):
+        ship = self.S.manager.get_entity('metadata', 1)
+        table = self.S.manager._tables['position']
+
+        self.assertIsInstance(ship, engine.ColumnarEntity)
+        self.assertEqual(table.columns['x'].get(ship._row), 480)
+        ship.x = 500
+        self.assertEqual(table.columns['x'].get(ship._row), 500)
+        self.assertEqual(ship.owner.pk, 0)
+        self.assertEqual(ship.serialize(), {'pk': 1, 'type': 'ship', 'x': 500, 'y': 235, 'owner_id': 0})
+
+        ship.dx = 5
+        self.assertEqual(ship.__dict__, {'dx': 5})
+
+    def test_get_columns(self):
+        entities, (xs, owners) = self.S.manager.get_columns('position', ['x', 'owner_id'])
+
+        self.assertEqual([entity.pk for entity in entities], [1, 2])
+        self.assertEqual(xs, [480, 460])
+        self.assertEqual(owners, [0, None])
+
+        self.S.manager.unregister_entity(entities[0])
+        entities, (xs,) = self.S.manager.get_columns('position', ['x'])
+        self.assertEqual(xs, [460])
+
+    def test_get_columns_without_columns(self):
+        state = {'turn': 2500, 'width': 1000, 'seq': 1,
+                 'entities': [{'pk': 0, 'type': 'ship', 'x': 456, 'y': 337}]}
+        S = engine.GameState(state, {})
+
+        entities, (xs, owners) = S.manager.get_columns('position', ['x', 'owner_id'])
+        self.assertEqual(xs, [456])
+        self.assertEqual(owners, [None])
+
 
 class PersistenceTestCase(unittest.TestCase):
     def test_empty_universe(self):
@@ -403,3 +601,56 @@ class MovementTestCase(unittest.TestCase):
         self.assertEqual(len(results['entities']), 4)
         coordinates = {(entity['x'], entity['y']) for entity in results['entities']}
         self.assertEqual(coordinates, {(550, 550)})
+
+
+class ParallelTestCase(unittest.TestCase):
+    def setUp(self):
+        entities = [
+            {
+                'pk': 0,
+                'type': 'species',
+                'name': 'Human',
+                'plural_name': 'Humans',
+                'growth_rate': 15,
+                'gravity_immune': False,
+                'gravity_min': 32,
+                'gravity_max': 86,
+                'temperature_immune': False,
+                'temperature_min': 10,
+                'temperature_max': 64,
+                'radiation_immune': True,
+            },
+        ]
+        for pk in range(1, 21):
+            entities.append({
+                'pk': pk, 'type': 'planet', 'x': 10 * pk, 'y': 20 * pk,
+                'gravity': 3 * pk, 'temperature': 4 * pk, 'radiation': 5 * pk,
+                'ironium_conc': 50, 'boranium_conc': 50, 'germanium_conc': 50,
+                'owner_id': 0, 'population': 25_000 * pk,
+            })
+        entities.extend([
+            {'pk': 21, 'type': 'ship', 'x': 480, 'y': 235},
+            {'pk': 22, 'type': 'ship', 'x': 460, 'y': 215},
+            {'pk': 23, 'type': 'ship', 'x': 500, 'y': 500},
+            {'pk': 24, 'type': 'ship', 'x': 600, 'y': 500},
+            {'pk': 25, 'type': 'movement_order', 'actor_id': 21, 'seq': 0, 'target_id': 22, 'warp': 10},
+            {'pk': 26, 'type': 'movement_order', 'actor_id': 22, 'seq': 0, 'target_id': 21, 'warp': 10},
+            {'pk': 27, 'type': 'movement_order', 'actor_id': 23, 'seq': 0, 'target_id': 24, 'warp': 10},
+            {'pk': 28, 'type': 'movement_order', 'actor_id': 24, 'seq': 0, 'x_t': 660, 'y_t': 500, 'warp': 5},
+        ])
+        self.state = {'turn': 2500, 'width': 1000, 'seq': 29, 'entities': entities}
+        self.serial = engine.GameState(copy.deepcopy(self.state), {}).generate()
+
+    def test_threads(self):
+        with mock.patch.object(systems.PopulationGrowthSystem, 'CHUNK', 3):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = engine.GameState(copy.deepcopy(self.state), {}).generate(executor=executor)
+
+        self.assertEqual(results, self.serial)
+
+    def test_processes(self):
+        with mock.patch.object(systems.PopulationGrowthSystem, 'CHUNK', 7):
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                results = engine.GameState(copy.deepcopy(self.state), {}).generate(executor=executor)
+
+        self.assertEqual(results, self.serial)
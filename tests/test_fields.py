@@ -98,6 +98,19 @@ class IntFieldTestCase(unittest.TestCase):
             field.validate({'widgets': 200})
         self.assertEqual(str(e.exception), "'widgets' must be less than or equal to 100.")
 
+    def test_column(self):
+        field = fields.IntField(min=0, max=100, required=True)
+        field.name = 'widgets'
+        validate_column = field.column_validator()
+
+        self.assertEqual(validate_column([{'widgets': 0}, {'widgets': 100}, {'widgets': True}]), [])
+        self.assertEqual(
+            validate_column([{'widgets': 200}, {'widgets': 42}, {}, {'widgets': 'a'}]),
+            [(0, "'widgets' must be less than or equal to 100."),
+             (2, "'widgets' is required."),
+             (3, "'widgets' must be an integer.")]
+        )
+
 
 class CharFieldTestCase(unittest.TestCase):
     def test_not_required(self):
@@ -0,0 +1,52 @@
+import math
+import unittest
+
+from universe import fixedpoint
+
+
+class IsqrtTestCase(unittest.TestCase):
+    def test_values(self):
+        for n in list(range(200)) + [10 ** 24, 10 ** 24 - 1, 2 ** 127 + 12345]:
+            root = fixedpoint._isqrt(n)
+            self.assertLessEqual(root * root, n)
+            self.assertGreater((root + 1) * (root + 1), n)
+            self.assertEqual(root, fixedpoint.isqrt(n))
+
+    def test_negative(self):
+        with self.assertRaises(ValueError):
+            fixedpoint._isqrt(-1)
+
+
+class DivideTestCase(unittest.TestCase):
+    def test_round_half_even(self):
+        self.assertEqual(fixedpoint.divide(5, 2), 2)
+        self.assertEqual(fixedpoint.divide(7, 2), 4)
+        self.assertEqual(fixedpoint.divide(-5, 2), -2)
+        self.assertEqual(fixedpoint.divide(-7, 2), -4)
+        self.assertEqual(fixedpoint.divide(5, -2), -2)
+        self.assertEqual(fixedpoint.divide(-5, -2), 2)
+
+    def test_round_nearest(self):
+        self.assertEqual(fixedpoint.divide(10, 3), 3)
+        self.assertEqual(fixedpoint.divide(11, 3), 4)
+        self.assertEqual(fixedpoint.divide(-11, 3), -4)
+        self.assertEqual(fixedpoint.divide(12, 3), 4)
+
+    def test_matches_round(self):
+        for a in range(-50, 50):
+            for b in (1, 2, 3, 4, 7, -2, -5):
+                self.assertEqual(fixedpoint.divide(a, b), round(a / b))
+
+
+class ScaleTestCase(unittest.TestCase):
+    def test_scale(self):
+        self.assertEqual(fixedpoint.to_fixed(3, 100), 300)
+        self.assertEqual(fixedpoint.to_int(250, 100), 2)
+        self.assertEqual(fixedpoint.to_int(350, 100), 4)
+        self.assertEqual(fixedpoint.round_fixed(-149, 100), -100)
+        self.assertEqual(fixedpoint.to_int(fixedpoint.to_fixed(17)), 17)
+
+    def test_sqrt_of_scaled(self):
+        S = fixedpoint.SCALE
+        self.assertEqual(fixedpoint.isqrt((3 * S) ** 2 + (4 * S) ** 2), 5 * S)
+        self.assertEqual(fixedpoint.to_int(fixedpoint.isqrt(2 * S * S)), round(math.sqrt(2)))
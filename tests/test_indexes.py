@@ -0,0 +1,114 @@
+import json
+import tempfile
+import unittest
+
+from universe import engine, indexes, mapped
+
+
+class Order:
+    def __init__(self, pk, actor_id):
+        self.pk, self.actor_id = pk, actor_id
+
+
+class ReferencesTestCase(unittest.TestCase):
+    def test_references(self):
+        index = indexes.References('actor_id')
+        orders = [Order(1, 5), Order(2, 6), Order(3, 5), Order(4, None)]
+        for order in orders:
+            index.add(order)
+
+        self.assertEqual(index.get(5), [orders[0], orders[2]])
+        self.assertEqual(index.get(7), [])
+        self.assertEqual(list(index.items()), [(5, [orders[0], orders[2]]), (6, [orders[1]])])
+
+        index.discard(orders[0])
+        orders[0].actor_id = 6
+        index.add(orders[0])
+        self.assertEqual(index.get(5), [orders[2]])
+        self.assertEqual(index.get(6), [orders[1], orders[0]])
+
+        # Entities that are not in the index are ignored, and invalid values are not indexed.
+        index.discard(Order(5, 5))
+        index.discard(orders[2])
+        orders[2].actor_id = '5'
+        index.add(orders[2])
+        self.assertEqual(index.get(5), [])
+        self.assertNotIn(orders[2], index)
+
+        index.discard(orders[1])
+        self.assertNotIn(orders[1], index)
+        self.assertEqual(len(index), 1)
+
+
+class ManagerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.state = {
+            'turn': 2500, 'width': 1000, 'seq': 7,
+            'entities': [
+                {'pk': 0, 'type': 'species', 'name': 'Human', 'plural_name': 'Humans', 'growth_rate': 15,
+                 'gravity_immune': True, 'temperature_immune': True, 'radiation_immune': True},
+                {'pk': 1, 'type': 'planet', 'x': 480, 'y': 235, 'gravity': 50, 'temperature': 50,
+                 'radiation': 50, 'ironium_conc': 50, 'boranium_conc': 50, 'germanium_conc': 50,
+                 'owner_id': 0, 'population': 1000},
+                {'pk': 2, 'type': 'ship', 'x': 100, 'y': 100, 'owner_id': 0},
+                {'pk': 3, 'type': 'ship', 'x': 110, 'y': 100},
+                {'pk': 4, 'type': 'movement_order', 'actor_id': 2, 'seq': 0, 'target_id': 1, 'warp': 1},
+                {'pk': 5, 'type': 'movement_order', 'actor_id': 2, 'seq': 1, 'x_t': 0, 'y_t': 0, 'warp': 1},
+                {'pk': 6, 'type': 'movement_order', 'actor_id': 3, 'seq': 0, 'target_id': 2, 'warp': 1},
+            ]
+        }
+
+    def pks(self, manager, data_name, pk):
+        return [entity.pk for entity in manager.get_referrers(data_name, pk)]
+
+    def test_maintained(self):
+        for storage in engine.Manager.STORAGE_TYPES:
+            S = engine.GameState(json.loads(json.dumps(self.state)), {}, storage=storage)
+            manager = S.manager
+            self.assertEqual(self.pks(manager, 'owner_id', 0), [1, 2], storage)
+            self.assertEqual(self.pks(manager, 'actor_id', 2), [4, 5], storage)
+            self.assertEqual(self.pks(manager, 'target_id', 2), [6], storage)
+            self.assertEqual(self.pks(manager, 'owner_id', 1), [], storage)
+            self.assertEqual(manager.get_referrers('nothing_id', 0), [], storage)
+
+            ship = manager.get_entity('metadata', 3)
+            ship.owner = manager.get_entity('species', 0)
+            self.assertEqual(self.pks(manager, 'owner_id', 0), [1, 2, 3], storage)
+            del ship.owner_id
+            self.assertEqual(self.pks(manager, 'owner_id', 0), [1, 2], storage)
+
+            manager.unregister_entity(manager.get_entity('metadata', 4))
+            manager.register_entity({'type': 'movement_order', 'actor_id': 3, 'seq': 1, 'x_t': 0, 'y_t': 0, 'warp': 1})
+            self.assertEqual(self.pks(manager, 'actor_id', 2), [5], storage)
+            self.assertEqual(self.pks(manager, 'actor_id', 3), [6, 7], storage)
+            self.assertEqual(self.pks(manager, 'target_id', 1), [], storage)
+
+    def test_empty(self):
+        # An index with nothing in it yet is still the one the manager maintains.
+        S = engine.GameState({'turn': 2500, 'width': 1000, 'entities': []}, {})
+        index = S.manager.get_references('owner_id')
+        self.assertEqual(len(index), 0)
+        S.manager.register_entity({'type': 'species', 'name': 'Human', 'plural_name': 'Humans', 'growth_rate': 15,
+                                   'gravity_immune': True, 'temperature_immune': True, 'radiation_immune': True})
+        S.manager.register_entity({'type': 'ship', 'x': 0, 'y': 0, 'owner_id': 0})
+        self.assertEqual([entity.pk for entity in index.get(0)], [1])
+        self.assertEqual(len(S.manager.get_references('nothing_id')), 0)
+
+    def test_turn(self):
+        # The first order of ship 2 is reached and the second deleted, while the planet keeps its owner.
+        self.state['entities'][2].update(x=479, y=235)
+        updates = {0: [{'action': 'delete', 'actor_id': 2, 'seq': 1}]}
+        S = engine.GameState(json.loads(json.dumps(self.state)), updates)
+        S.generate()
+        self.assertEqual(self.pks(S.manager, 'actor_id', 2), [])
+        self.assertEqual(self.pks(S.manager, 'owner_id', 0), [1, 2])
+
+    def test_mapped(self):
+        S = engine.GameState(json.loads(json.dumps(self.state)), {}, storage='columnar')
+        with tempfile.TemporaryFile() as fp:
+            mapped.write_state(fp, S.old, S.manager)
+            fp.seek(0)
+            S = engine.GameState(mapped.read_state(fp), {}, storage='columnar')
+            self.assertEqual(self.pks(S.manager, 'owner_id', 0), [1, 2])
+            self.assertEqual(self.pks(S.manager, 'actor_id', 2), [4, 5])
+            del S
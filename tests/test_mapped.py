@@ -0,0 +1,77 @@
+import json
+import tempfile
+import unittest
+
+from universe import engine, exceptions, mapped
+
+
+class MappedTestCase(unittest.TestCase):
+    def setUp(self):
+        self.state = {
+            'turn': 2500, 'width': 1000, 'seq': 6,
+            'entities': [
+                {'pk': 0, 'type': 'species', 'name': 'Human', 'plural_name': 'Humans', 'growth_rate': 15,
+                 'gravity_immune': False, 'gravity_min': 32, 'gravity_max': 86,
+                 'temperature_immune': True, 'radiation_immune': True},
+                {'pk': 1, 'type': 'planet', 'x': 480, 'y': 235, 'gravity': 50, 'temperature': 50,
+                 'radiation': 50, 'ironium_conc': 50, 'boranium_conc': 50, 'germanium_conc': 50,
+                 'owner_id': 0, 'population': 2**70},
+                {'pk': 2, 'type': 'planet', 'x': 10, 'y': 999, 'gravity': 1, 'temperature': 99,
+                 'radiation': 0, 'ironium_conc': 5, 'boranium_conc': 6, 'germanium_conc': 7},
+                {'pk': 3, 'type': 'ship', 'x': -70_000, 'y': 2, 'owner_id': 0, 'population': 2000},
+                {'pk': 5, 'type': 'movement_order', 'actor_id': 3, 'seq': 0, 'x_t': 10, 'y_t': 2, 'warp': 5},
+            ]
+        }
+        self.expected = engine.GameState(json.loads(json.dumps(self.state)), {}).generate()
+
+        self.file = tempfile.TemporaryFile()
+        S = engine.GameState(json.loads(json.dumps(self.state)), {}, storage='columnar')
+        mapped.write_state(self.file, S.old, S.manager)
+        self.file.seek(0)
+
+    def tearDown(self):
+        self.file.close()
+
+    def test_columnar(self):
+        S = engine.GameState(mapped.read_state(self.file), {}, storage='columnar')
+
+        self.assertEqual(S.generate(), self.expected)
+        # Columns that the turn did not write to are still views onto the file.
+        table = S.manager._tables['environment']
+        self.assertIsInstance(table.columns['gravity'].values, memoryview)
+
+    def test_other_storage(self):
+        for storage in ('dict', 'compact'):
+            self.file.seek(0)
+            S = engine.GameState(mapped.read_state(self.file), {}, storage=storage)
+            self.assertEqual(S.generate(), self.expected)
+
+    def test_new_entities(self):
+        S = engine.GameState(mapped.read_state(self.file), {}, storage='columnar')
+        S.manager.register_entity({'pk': 6, 'type': 'ship', 'x': 1, 'y': 1})
+
+        self.assertEqual(S.manager.get_entity('metadata', 6).x, 1)
+        self.assertEqual(S.manager.get_entity('metadata', 2).gravity, 1)
+        self.assertEqual(S.manager.get_entity('metadata', 1).population, 2**70)
+
+    def test_unregistered_entities(self):
+        S = engine.GameState(json.loads(json.dumps(self.state)), {}, storage='columnar')
+        S.manager.unregister_entity(S.manager.get_entity('metadata', 2))
+        with tempfile.TemporaryFile() as fp:
+            mapped.write_state(fp, S.old, S.manager)
+            fp.seek(0)
+            S = engine.GameState(mapped.read_state(fp), {}, storage='columnar')
+
+            self.assertIsNone(S.manager.get_entity('metadata', 2))
+            self.assertEqual(S.manager.get_entity('metadata', 3).x, -70_000)
+
+    def test_invalid(self):
+        S = engine.GameState(json.loads(json.dumps(self.state)), {}, storage='columnar')
+        S.manager.get_entity('metadata', 2).gravity = 200
+        with tempfile.TemporaryFile() as fp, self.assertRaises(exceptions.ValidationErrors):
+            mapped.write_state(fp, S.old, S.manager)
+
+    def test_requires_columnar(self):
+        S = engine.GameState(json.loads(json.dumps(self.state)), {})
+        with tempfile.TemporaryFile() as fp, self.assertRaises(ValueError):
+            mapped.write_state(fp, S.old, S.manager)
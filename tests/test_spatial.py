@@ -0,0 +1,180 @@
+import json
+import random
+import tempfile
+import unittest
+
+from universe import engine, mapped, spatial
+
+
+class Point:
+    def __init__(self, pk, x, y):
+        self.pk, self.x, self.y = pk, x, y
+
+
+class GridTestCase(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.grid = spatial.Grid(size=10)
+        self.points = [Point(pk, random.randint(-50, 150), random.randint(-50, 150)) for pk in range(300)]
+        for point in self.points:
+            self.grid.add(point)
+
+    def distance(self, point, x, y):
+        return (point.x - x) ** 2 + (point.y - y) ** 2
+
+    def test_within(self):
+        for x, y, radius in [(0, 0, 0), (50, 50, 7), (-3, 120, 25), (500, 500, 10), (50, 50, 1000)]:
+            expected = [point for point in self.points if self.distance(point, x, y) <= radius ** 2]
+            self.assertEqual(sorted(self.grid.within(x, y, radius), key=self.points.index), expected)
+
+    def test_fractional(self):
+        # Radii, coordinates and bounds need not be integers.
+        for x, y, radius in [(50, 50, 7.5), (-3.25, 120.5, 25.1), (0.5, 0.5, 0.7)]:
+            expected = [point for point in self.points if self.distance(point, x, y) <= radius ** 2]
+            self.assertEqual(sorted(self.grid.within(x, y, radius), key=self.points.index), expected)
+
+        expected = [point for point in self.points if 9.5 <= point.x <= 30.5 and -0.5 <= point.y <= 20.2]
+        self.assertEqual(sorted(self.grid.rectangle(9.5, -0.5, 30.5, 20.2), key=self.points.index), expected)
+
+        expected = sorted(self.points, key=lambda point: (self.distance(point, 51.5, 48.5), point.pk))[:5]
+        self.assertEqual(self.grid.nearest(51.5, 48.5, 5), expected)
+
+    def test_rectangle(self):
+        for x0, y0, x1, y1 in [(0, 0, 0, 0), (10, 10, 19, 19), (-50, 0, 150, 3), (7, 7, 5, 5)]:
+            expected = [point for point in self.points if x0 <= point.x <= x1 and y0 <= point.y <= y1]
+            self.assertEqual(sorted(self.grid.rectangle(x0, y0, x1, y1), key=self.points.index), expected)
+
+    def test_nearest(self):
+        for x, y, count in [(0, 0, 1), (51, 49, 5), (1000, -1000, 3), (50, 50, 300), (50, 50, 400)]:
+            expected = sorted(self.points, key=lambda point: (self.distance(point, x, y), point.pk))[:count]
+            self.assertEqual(self.grid.nearest(x, y, count), expected)
+        self.assertEqual(spatial.Grid().nearest(0, 0), [])
+
+    def test_nearest_ties(self):
+        # Equally distant entities go by pk, even when the lower pk is in a cell further out.
+        grid = spatial.Grid(size=15)
+        points = [Point(2, 10, 89), Point(1, 9, 90)]
+        for point in points:
+            grid.add(point)
+        self.assertEqual(grid.nearest(9, 89), [points[1]])
+
+    def test_move(self):
+        # Entities are found by their current coordinates, so they move by being taken out and put back.
+        point = self.points[0]
+        self.grid.discard(point)
+        point.x, point.y = 1000, 1000
+        self.grid.add(point)
+        self.assertEqual(self.grid.within(1000, 1000, 0), [point])
+        self.assertIn(point, self.grid)
+
+        # Entities that are not in the grid are ignored, and invalid coordinates are left out.
+        self.grid.discard(Point(300, 1000, 1000))
+        self.grid.discard(point)
+        point.x = None
+        self.grid.add(point)
+        self.assertEqual(self.grid.within(1000, 1000, 0), [])
+        self.assertNotIn(point, self.grid)
+        self.assertEqual(len(self.grid), 299)
+
+
+class LocationsTestCase(unittest.TestCase):
+    def test_locations(self):
+        locations = spatial.Locations()
+        points = [Point(3, 5, 5), Point(1, 5, 5), Point(2, 5, 6), Point(4, 0, 0), Point(5, None, 5)]
+        for point in points:
+            locations.add(point)
+
+        self.assertEqual(locations.at(5, 5), [points[1], points[0]])
+        self.assertEqual(locations.at(0, 0), [points[3]])
+        self.assertEqual(locations.at(6, 5), [])
+        self.assertEqual(locations.groups(), [[points[1], points[0]]])
+        self.assertNotIn(points[4], locations)
+        self.assertEqual(len(locations), 4)
+
+        locations.discard(points[2])
+        points[2].y = 5
+        locations.add(points[2])
+        self.assertEqual(locations.at(5, 5), [points[1], points[2], points[0]])
+        self.assertEqual(locations.at(5, 6), [])
+
+        # Entities that are not at their point are ignored, and a point left with one entity holds it alone.
+        locations.discard(Point(6, 5, 5))
+        locations.discard(points[0])
+        locations.discard(points[1])
+        self.assertEqual(locations.at(5, 5), [points[2]])
+        self.assertIn(points[2], locations)
+        self.assertEqual(locations.groups(), [])
+        locations.discard(points[2])
+        self.assertEqual(locations.at(5, 5), [])
+        self.assertEqual(len(locations), 1)
+
+
+class ManagerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.state = {
+            'turn': 2500, 'width': 1000, 'seq': 5,
+            'entities': [
+                {'pk': 0, 'type': 'species', 'name': 'Human', 'plural_name': 'Humans', 'growth_rate': 15,
+                 'gravity_immune': True, 'temperature_immune': True, 'radiation_immune': True},
+                {'pk': 1, 'type': 'planet', 'x': 480, 'y': 235, 'gravity': 50, 'temperature': 50,
+                 'radiation': 50, 'ironium_conc': 50, 'boranium_conc': 50, 'germanium_conc': 50},
+                {'pk': 2, 'type': 'ship', 'x': 100, 'y': 100, 'owner_id': 0},
+                {'pk': 3, 'type': 'ship', 'x': 110, 'y': 100, 'owner_id': 0},
+                {'pk': 4, 'type': 'movement_order', 'actor_id': 2, 'seq': 0, 'x_t': 400, 'y_t': 100, 'warp': 10},
+            ]
+        }
+
+    def pks(self, entities):
+        return sorted(entity.pk for entity in entities)
+
+    def test_maintained(self):
+        for storage in engine.Manager.STORAGE_TYPES:
+            S = engine.GameState(json.loads(json.dumps(self.state)), {}, storage=storage)
+            index = S.manager.spatial
+            self.assertEqual(index.size, 1000 // spatial.Grid.CELLS)
+            self.assertEqual(self.pks(index.within(100, 100, 10)), [2, 3], storage)
+
+            S.generate()
+            self.assertEqual(self.pks(index.within(100, 100, 10)), [3], storage)
+            self.assertEqual(self.pks(index.within(200, 100, 0)), [2], storage)
+
+            ship = S.manager.get_entity('metadata', 3)
+            ship.y = 900
+            self.assertEqual(self.pks(index.rectangle(0, 800, 999, 999)), [3], storage)
+            S.manager.unregister_entity(ship)
+            self.assertEqual(self.pks(index.rectangle(0, 800, 999, 999)), [], storage)
+            ship.y = 850
+            self.assertEqual(self.pks(index.rectangle(0, 800, 999, 999)), [], storage)
+
+            S.manager.register_entity({'type': 'ship', 'x': 480, 'y': 236})
+            self.assertEqual(self.pks(index.nearest(480, 240, 2)), [1, 5], storage)
+
+            # A ship registered without valid coordinates is placed once it is given them.
+            ship = S.manager.register_entity({'type': 'ship', 'x': 'far', 'y': 10})
+            self.assertEqual(self.pks(index.within(10, 10, 0)), [], storage)
+            ship.x = 10
+            self.assertEqual(self.pks(index.within(10, 10, 0)), [6], storage)
+
+    def test_colocated(self):
+        self.state['entities'][3].update(x=450, y=235)
+        self.state['entities'].append(
+            {'pk': 5, 'type': 'movement_order', 'actor_id': 3, 'seq': 0, 'target_id': 1, 'warp': 10})
+        self.state['seq'] = 6
+        for storage in engine.Manager.STORAGE_TYPES:
+            S = engine.GameState(json.loads(json.dumps(self.state)), {}, storage=storage)
+            self.assertEqual(S.manager.locations.groups(), [], storage)
+
+            S.generate()
+            locations = S.manager.locations
+            self.assertEqual([entity.pk for entity in locations.at(480, 235)], [1, 3], storage)
+            self.assertEqual([[entity.pk for entity in group] for group in locations.groups()], [[1, 3]], storage)
+
+    def test_mapped(self):
+        S = engine.GameState(json.loads(json.dumps(self.state)), {}, storage='columnar')
+        with tempfile.TemporaryFile() as fp:
+            mapped.write_state(fp, S.old, S.manager)
+            fp.seek(0)
+            S = engine.GameState(mapped.read_state(fp), {}, storage='columnar')
+            self.assertEqual(self.pks(S.manager.spatial.within(100, 100, 10)), [2, 3])
+            self.assertEqual(self.pks(S.manager.locations.at(480, 235)), [1])
+            del S
@@ -0,0 +1,97 @@
+import copy
+import io
+import json
+import unittest
+
+from universe import engine, streaming
+
+
+STATE = {
+    'turn': 2500, 'width': 1000, 'seq': 4,
+    'entities': [
+        {'pk': 0, 'type': 'species', 'name': 'Human [\\"]', 'plural_name': 'Humans', 'growth_rate': 15,
+         'gravity_immune': True, 'temperature_immune': True, 'radiation_immune': True},
+        {'pk': 1, 'type': 'planet', 'x': 480, 'y': 235, 'gravity': 50, 'temperature': 50,
+         'radiation': 50, 'ironium_conc': 50, 'boranium_conc': 50, 'germanium_conc': 50,
+         'owner_id': 0, 'population': 123456789},
+        {'pk': 2, 'type': 'ship', 'x': 1, 'y': 2},
+        {'pk': 3, 'type': 'movement_order', 'actor_id': 2, 'seq': 0, 'x_t': 10, 'y_t': 2, 'warp': 5},
+    ]
+}
+
+
+class ReadStateTestCase(unittest.TestCase):
+    def setUp(self):
+        self.state = copy.deepcopy(STATE)
+
+    def read(self, text, chunk_size):
+        state = streaming.read_state(io.StringIO(text), chunk_size)
+        state['entities'] = list(state['entities'])
+        return state
+
+    def test_document(self):
+        for chunk_size in (1, 7, 1 << 16):
+            self.assertEqual(self.read(json.dumps(self.state, indent=2), chunk_size), self.state)
+
+    def test_trailing_keys(self):
+        state = {'entities': self.state['entities'], 'turn': 2500, 'width': 1000}
+        self.assertEqual(self.read(json.dumps(state), 5), state)
+
+    def test_empty(self):
+        self.assertEqual(self.read('{"turn": 1, "entities": [ ]}', 3), {'turn': 1, 'entities': []})
+        self.assertEqual(self.read('{}', 3), {'entities': []})
+
+    def test_lines(self):
+        headers = {key: value for key, value in self.state.items() if key != 'entities'}
+        text = '\n'.join(json.dumps(item) for item in [headers] + self.state['entities']) + '\n'
+        for chunk_size in (1, 7, 1 << 16):
+            self.assertEqual(self.read(text, chunk_size), self.state)
+
+    def test_malformed(self):
+        with self.assertRaises(ValueError):
+            self.read('{"turn": 1, "entities": [{"pk": 0} {"pk": 1}]}', 4)
+
+        # Truncated files, including those cut off right after a complete value.
+        for text in ['{"turn": 1, "entities": [{"pk": 0}]', '{"turn": 1, "entities": [{"pk": 0}',
+                     '{"turn": 1, "width": 5', '{"turn": 1, "entities": [], "width": 5', '{']:
+            with self.assertRaises(ValueError, msg=text):
+                self.read(text, 4)
+
+    def test_game_state(self):
+        expected = engine.GameState(json.loads(json.dumps(self.state)), {}).generate()
+        results = engine.GameState(streaming.read_state(io.StringIO(json.dumps(self.state))), {}).generate()
+
+        self.assertEqual(results, expected)
+
+
+class WriteStateTestCase(unittest.TestCase):
+    def setUp(self):
+        self.state = copy.deepcopy(STATE)
+
+    def write(self, state, lines=False):
+        fp = io.StringIO()
+        streaming.write_state(fp, dict(state, entities=iter(state['entities'])), lines=lines)
+        return fp.getvalue()
+
+    def test_document(self):
+        self.assertEqual(self.write(self.state), json.dumps(self.state))
+        self.assertEqual(self.write({'turn': 1, 'entities': []}), json.dumps({'turn': 1, 'entities': []}))
+
+    def test_lines(self):
+        text = self.write(self.state, lines=True)
+
+        self.assertEqual(len(text.splitlines()), 5)
+        state = streaming.read_state(io.StringIO(text))
+        self.assertEqual(dict(state, entities=list(state['entities'])), self.state)
+
+    def test_generate_to(self):
+        expected = engine.GameState(json.loads(json.dumps(self.state)), {}).generate()
+
+        for lines in (False, True):
+            fp = io.StringIO()
+            engine.GameState(json.loads(json.dumps(self.state)), {}).generate_to(fp, lines=lines)
+            fp.seek(0)
+            results = streaming.read_state(fp)
+            self.assertEqual(dict(results, entities=list(results['entities'])), expected)
+            if not lines:
+                self.assertEqual(fp.getvalue(), json.dumps(expected))
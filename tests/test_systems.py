@@ -1,6 +1,9 @@
+import functools
+import random
 import unittest
+from decimal import Decimal
 
-from universe import engine, systems
+from universe import engine, systems, utils
 
 
 class UpdateTestCase(unittest.TestCase):
@@ -439,6 +442,319 @@ class UpdateTestCase(unittest.TestCase):
         )
 
 
+class MovementTestCase(unittest.TestCase):
+    def test_simulate_fixed_goal(self):
+        system = systems.MovementSystem()
+        S = system.SCALE
+        speed = 10 ** 2 * S // system.N
+
+        X, Y = system._simulate([480 * S], [235 * S], [speed], [None], [168 * S], [870 * S])
+        self.assertEqual((system._round(X[0]) // S, system._round(Y[0]) // S), (436, 325))
+
+    def test_simulate_pursuit(self):
+        system = systems.MovementSystem()
+        S = system.SCALE
+        speed = 10 ** 2 * S // system.N
+
+        X, Y = system._simulate(
+            [480 * S, 460 * S], [235 * S, 215 * S], [speed, speed], [1, None], [None, 465 * S], [None, 220 * S])
+        self.assertEqual([system._round(x) // S for x in X], [465, 465])
+        self.assertEqual([system._round(y) // S for y in Y], [220, 220])
+
+    def test_closed_form(self):
+        system = systems.MovementSystem()
+        S = system.SCALE
+
+        for (x, y, warp, x_t, y_t) in [(480, 235, 10, 168, 870), (480, 235, 10, 422, 210),
+                                       (500, 500, 1, 501, 500), (0, 0, 0, 5, 5), (10, 10, 3, 10, 19)]:
+            speed = warp ** 2 * S // system.N
+            end = system._closed_form(x * S, y * S, speed, x_t * S, y_t * S)
+            X, Y = system._simulate([x * S], [y * S], [speed], [None], [x_t * S], [y_t * S])
+            self.assertEqual(
+                (system._round(end[0]), system._round(end[1])), (system._round(X[0]), system._round(Y[0])))
+
+    def test_closed_form_ambiguous(self):
+        system = systems.MovementSystem()
+        S = system.SCALE
+
+        # Travelling exactly 2.5 light-years leaves the end position on a rounding boundary.
+        speed = 5 * S // (2 * system.N)
+        self.assertIsNone(system._closed_form(0, 0, speed, 1000 * S, 0))
+
+    def test_solve_only_simulates_pursuit(self):
+        simulated = []
+
+        class RecordingMovementSystem(systems.MovementSystem):
+            def _simulate(self, X, Y, speed, targets, TX, TY):
+                simulated.append(targets)
+                return super()._simulate(X, Y, speed, targets, TX, TY)
+
+        system = RecordingMovementSystem()
+        S = system.SCALE
+        speed = 10 ** 2 * S // system.N
+
+        X, Y = system._solve(
+            [480 * S, 460 * S, 100 * S], [235 * S, 215 * S, 100 * S], [speed, speed, speed],
+            [1, None, None], [None, 465 * S, 200 * S], [None, 220 * S, 100 * S])
+        self.assertEqual(simulated, [[1, None]])
+        self.assertEqual([system._round(x) // S for x in X], [465, 465, 200])
+        self.assertEqual([system._round(y) // S for y in Y], [220, 220, 100])
+
+    def test_schedule(self):
+        system = systems.MovementSystem()
+
+        # 0 -> 1 -> 2, 3 <-> 4, 5 -> 3, 6 alone
+        order, cyclic = system._schedule([1, 2, None, 4, 3, 3, None])
+        self.assertEqual(sorted(order), list(range(7)))
+        for i, t in enumerate([1, 2, None, None, None, 3, None]):
+            if t is not None:
+                self.assertLess(order.index(t), order.index(i))
+        self.assertEqual(cyclic, {3, 4})
+
+    def test_groups(self):
+        system = systems.MovementSystem()
+        groups = system._groups([0, 1, 2, 3, 4, 5], [1, 2, None, 4, 3, 3])
+        self.assertEqual(sorted(groups), [[0, 1, 2], [3, 4, 5]])
+
+    def test_solve_pursuit_of_stable_target(self):
+        simulated = []
+
+        class RecordingMovementSystem(systems.MovementSystem):
+            def _simulate(self, X, Y, speed, targets, TX, TY):
+                simulated.append(targets)
+                return super()._simulate(X, Y, speed, targets, TX, TY)
+
+        system = RecordingMovementSystem()
+        S = system.SCALE
+        speed = 10 ** 2 * S // system.N
+
+        # Ship 1 cannot reach its goal this turn, so ship 0 heads straight for where ship 1 will stop.
+        args = ([480 * S, 460 * S], [235 * S, 215 * S], [speed, speed], [1, None], [None, 900 * S], [None, 215 * S])
+        X, Y = system._solve(*args)
+        self.assertEqual(simulated, [])
+
+        X_s, Y_s = systems.MovementSystem()._simulate(*args)
+        self.assertEqual([system._round(x) for x in X], [system._round(x) for x in X_s])
+        self.assertEqual([system._round(y) for y in Y], [system._round(y) for y in Y_s])
+
+    def test_solve_cycle(self):
+        system = systems.MovementSystem()
+        S = system.SCALE
+        speed = 10 ** 2 * S // system.N
+
+        X, Y = system._solve([480 * S, 460 * S], [235 * S, 215 * S], [speed, speed], [1, 0], [None, None], [None, None])
+        self.assertEqual({(system._round(x) // S, system._round(y) // S) for x, y in zip(X, Y)}, {(470, 225)})
+
+    def test_reference_resolution(self):
+        system = systems.MovementSystem(steps=systems.MovementSystem.N)
+        S = system.SCALE
+        speed = 10 ** 2 * S // system.N
+        args = ([480 * S, 460 * S, 500 * S], [235 * S, 215 * S, 205 * S], [speed] * 3, [1, 2, 0],
+                [None] * 3, [None] * 3)
+
+        self.assertEqual(system._simulate(*args), systems.MovementSystem()._simulate(*args))
+
+    def test_adaptive_within_tolerance(self):
+        scenarios = [
+            [(480, 235, 10, 1, None), (460, 215, 10, None, (465, 220))],
+            [(560, 315, 10, 1, None), (460, 215, 10, None, (660, 215))],
+            [(560, 315, 10, 1, None), (460, 215, 10, None, (510, 215))],
+            [(480, 235, 10, 1, None), (460, 215, 10, 2, None), (500, 205, 10, 0, None)],
+            [(400, 400, 7, 1, None), (600, 450, 5, None, (300, 500)), (450, 600, 9, 1, None)],
+            [(500, 500, 10, 1, None), (600, 500, 10, 2, None), (600, 600, 10, 3, None), (500, 600, 10, 0, None)],
+        ]
+        tolerance = systems.MovementSystem.TOLERANCE
+        for config in (dict(adaptive=True), dict(steps=200, adaptive=True, stride=5)):
+            for scenario in scenarios:
+                ends = []
+                for system in (systems.MovementSystem(), systems.MovementSystem(**config)):
+                    S = system.SCALE
+                    X, Y = system._simulate(
+                        [x * S for x, y, warp, t, goal in scenario],
+                        [y * S for x, y, warp, t, goal in scenario],
+                        [warp ** 2 * S // system.steps for x, y, warp, t, goal in scenario],
+                        [t for x, y, warp, t, goal in scenario],
+                        [goal and goal[0] * S for x, y, warp, t, goal in scenario],
+                        [goal and goal[1] * S for x, y, warp, t, goal in scenario],
+                    )
+                    ends.append([(system._round(x) // S, system._round(y) // S) for x, y in zip(X, Y)])
+
+                for (x1, y1), (x2, y2) in zip(*ends):
+                    self.assertLessEqual(abs(x1 - x2), tolerance, (config, scenario))
+                    self.assertLessEqual(abs(y1 - y2), tolerance, (config, scenario))
+
+    def test_configured_game(self):
+        class AdaptiveGameState(engine.GameState):
+            SYSTEMS = [systems.UpdateSystem, functools.partial(systems.MovementSystem, adaptive=True),
+                       systems.PopulationGrowthSystem]
+
+        state = {
+            'turn': 2500, 'width': 1000, 'seq': 3,
+            'entities': [
+                {'pk': 0, 'type': 'ship', 'x': 480, 'y': 235},
+                {'pk': 1, 'type': 'ship', 'x': 460, 'y': 215},
+                {'pk': 2, 'type': 'movement_order', 'actor_id': 0, 'seq': 0, 'target_id': 1, 'warp': 10},
+            ]
+        }
+        results = AdaptiveGameState(state, {}).generate()
+        self.assertEqual(
+            results['entities'],
+            [{'pk': 0, 'type': 'ship', 'x': 460, 'x_prev': 480, 'y': 215, 'y_prev': 235},
+             {'pk': 1, 'type': 'ship', 'x': 460, 'x_prev': 460, 'y': 215, 'y_prev': 215}]
+        )
+
+    def test_simulate_nothing(self):
+        self.assertEqual(systems.MovementSystem()._simulate([], [], [], [], [], []), ([], []))
+
+
+class MovementGoldenTestCase(unittest.TestCase):
+    # End positions recorded from the Decimal implementation of the movement system.
+    def assertGolden(self, entities, expected):
+        state = {'turn': 2500, 'width': 1000, 'seq': len(entities), 'entities': entities}
+        results = engine.GameState(state, {}).generate()
+        self.assertEqual(
+            [(entity['pk'], entity['x'], entity['y']) for entity in results['entities'] if entity['type'] == 'ship'],
+            expected
+        )
+
+    def test_pursuit_chain(self):
+        self.assertGolden(
+            [{'pk': 0, 'type': 'ship', 'x': 460, 'y': 551},
+             {'pk': 1, 'type': 'ship', 'x': 539, 'y': 433},
+             {'pk': 2, 'type': 'ship', 'x': 494, 'y': 554},
+             {'pk': 3, 'type': 'ship', 'x': 521, 'y': 560},
+             {'pk': 4, 'type': 'ship', 'x': 548, 'y': 416},
+             {'pk': 5, 'type': 'movement_order', 'actor_id': 0, 'seq': 0, 'warp': 8, 'target_id': 2},
+             {'pk': 6, 'type': 'movement_order', 'actor_id': 1, 'seq': 0, 'warp': 8, 'x_t': 581, 'y_t': 543},
+             {'pk': 7, 'type': 'movement_order', 'actor_id': 2, 'seq': 0, 'warp': 3, 'target_id': 1},
+             {'pk': 8, 'type': 'movement_order', 'actor_id': 4, 'seq': 0, 'warp': 1, 'x_t': 332, 'y_t': 381}],
+            [(0, 501, 548), (1, 562, 493), (2, 501, 548), (3, 521, 560), (4, 547, 416)]
+        )
+
+    def test_pursuit_tree(self):
+        self.assertGolden(
+            [{'pk': 0, 'type': 'ship', 'x': 482, 'y': 438},
+             {'pk': 1, 'type': 'ship', 'x': 501, 'y': 566},
+             {'pk': 2, 'type': 'ship', 'x': 412, 'y': 418},
+             {'pk': 3, 'type': 'ship', 'x': 537, 'y': 424},
+             {'pk': 4, 'type': 'ship', 'x': 493, 'y': 549},
+             {'pk': 5, 'type': 'movement_order', 'actor_id': 0, 'seq': 0, 'warp': 9, 'target_id': 1},
+             {'pk': 6, 'type': 'movement_order', 'actor_id': 1, 'seq': 0, 'warp': 2, 'target_id': 4},
+             {'pk': 7, 'type': 'movement_order', 'actor_id': 2, 'seq': 0, 'warp': 10, 'target_id': 1},
+             {'pk': 8, 'type': 'movement_order', 'actor_id': 3, 'seq': 0, 'warp': 10, 'x_t': 595, 'y_t': 599},
+             {'pk': 9, 'type': 'movement_order', 'actor_id': 4, 'seq': 0, 'warp': 4, 'target_id': 1}],
+            [(0, 493, 518), (1, 500, 563), (2, 464, 504), (3, 568, 519), (4, 500, 563)]
+        )
+
+    def test_fixed_goals(self):
+        self.assertGolden(
+            [{'pk': 0, 'type': 'ship', 'x': 515, 'y': 543},
+             {'pk': 1, 'type': 'ship', 'x': 599, 'y': 519},
+             {'pk': 2, 'type': 'ship', 'x': 515, 'y': 530},
+             {'pk': 3, 'type': 'ship', 'x': 550, 'y': 448},
+             {'pk': 4, 'type': 'ship', 'x': 447, 'y': 531},
+             {'pk': 5, 'type': 'movement_order', 'actor_id': 0, 'seq': 0, 'warp': 10, 'x_t': 348, 'y_t': 528},
+             {'pk': 6, 'type': 'movement_order', 'actor_id': 1, 'seq': 0, 'warp': 2, 'x_t': 655, 'y_t': 624},
+             {'pk': 7, 'type': 'movement_order', 'actor_id': 2, 'seq': 0, 'warp': 7, 'x_t': 634, 'y_t': 678},
+             {'pk': 8, 'type': 'movement_order', 'actor_id': 3, 'seq': 0, 'warp': 3, 'x_t': 570, 'y_t': 332},
+             {'pk': 9, 'type': 'movement_order', 'actor_id': 4, 'seq': 0, 'warp': 4, 'x_t': 607, 'y_t': 315}],
+            [(0, 415, 534), (1, 601, 523), (2, 546, 568), (3, 552, 439), (4, 457, 518)]
+        )
+
+
+class PopulationGoldenTestCase(unittest.TestCase):
+    def decimal_growth(self, population, growth_rate, habitability):
+        # The Decimal implementation of population growth that the integer one replaced.
+        growth_rate = Decimal(growth_rate) / 100
+        habitability = Decimal(habitability) / 100
+        capacity = 1_000_000 * habitability
+
+        crowding, ratio = 1, 1
+        if habitability >= 0:
+            ratio = population / capacity
+            if ratio > 4:
+                growth_rate = Decimal('-0.12')
+            elif ratio > 1:
+                growth_rate = Decimal('-0.04') * (ratio - 1)
+            elif ratio > 0.25:
+                crowding = 16 * (1 - ratio) ** 2 / 9
+        else:
+            growth_rate = Decimal('0.10')
+
+        population *= 1 + growth_rate * habitability * crowding
+        return int(population.to_integral_value())
+
+    def test_growth(self):
+        system = systems.PopulationGrowthSystem()
+        rng = random.Random(0)
+        for _ in range(20_000):
+            habitability = rng.choice([rng.randint(-45, -1), rng.randint(1, 100)])
+            growth_rate = rng.randint(1, 20)
+            capacity = 10_000 * abs(habitability)
+            population = rng.choice([rng.randint(0, 5 * capacity), capacity // 4, capacity, 4 * capacity])
+            self.assertEqual(
+                system._grow(population, growth_rate, habitability),
+                self.decimal_growth(population, growth_rate, habitability),
+                (population, growth_rate, habitability)
+            )
+
+    def test_zero_habitability(self):
+        self.assertEqual(systems.PopulationGrowthSystem()._grow(1000, 15, 0), 1000)
+
+    def test_batched_turn(self):
+        # Every storage backend's batched turn should match growing each planet on its own.
+        rng = random.Random(0)
+        entities = []
+        for pk in range(3):
+            species = {'pk': pk, 'type': 'species', 'name': 'Human', 'plural_name': 'Humans',
+                       'growth_rate': rng.randint(1, 20)}
+            for env in utils.ENVIRONMENTS:
+                if rng.random() < 0.2:
+                    species[f'{env}_immune'] = True
+                else:
+                    _min = rng.randint(0, 80)
+                    species.update({f'{env}_immune': False, f'{env}_min': _min,
+                                    f'{env}_max': rng.randint(_min + 2, 100)})
+            entities.append(species)
+        for pk in range(3, 300):
+            planet = {
+                'pk': pk, 'type': 'planet', 'x': pk, 'y': pk,
+                'gravity': rng.randint(0, 100), 'temperature': rng.randint(0, 100), 'radiation': rng.randint(0, 100),
+                'ironium_conc': 50, 'boranium_conc': 50, 'germanium_conc': 50,
+                'owner_id': rng.choice([0, 1, 2]), 'population': rng.choice([0, 1, rng.randint(0, 5_000_000)]),
+            }
+            if rng.random() < 0.1:
+                del planet['owner_id']
+            entities.append(planet)
+        entities.append({'pk': 300, 'type': 'ship', 'x': 0, 'y': 0, 'owner_id': 0, 'population': 1000})
+
+        expected = {}
+        by_pk = {entity['pk']: entity for entity in entities[:3]}
+        for entity in entities[3:-1]:
+            if 'owner_id' not in entity:
+                expected[entity['pk']] = (None, entity['population'])
+                continue
+            species = by_pk[entity['owner_id']]
+            tolerances = tuple((species[f'{env}_immune'], species.get(f'{env}_min'), species.get(f'{env}_max'))
+                               for env in utils.ENVIRONMENTS)
+            habitability = utils.environment_value(tolerances, tuple(entity[env] for env in utils.ENVIRONMENTS))
+            population = systems.PopulationGrowthSystem()._grow(
+                entity['population'] or 0, species['growth_rate'], habitability
+            )
+            expected[entity['pk']] = (entity['owner_id'], population) if population > 0 else (None, None)
+        expected[300] = (0, 1000)
+
+        for storage in engine.Manager.STORAGE_TYPES:
+            state = {'turn': 2500, 'width': 1000, 'seq': 301, 'entities': [dict(entity) for entity in entities]}
+            results = engine.GameState(state, {}, storage=storage).generate()
+            self.assertEqual(
+                {entity['pk']: (entity.get('owner_id'), entity.get('population'))
+                 for entity in results['entities'] if entity['type'] != 'species'},
+                expected,
+                storage
+            )
+
+
 class PopulationGrowthTestCase(unittest.TestCase):
     def test_habitability_growth(self):
         state = {
@@ -1,3 +1,4 @@
+import random
 import unittest
 
 from universe import components, engine, utils
@@ -964,3 +965,73 @@ class PlanetValueTestCase(unittest.TestCase):
                  'radiation': r}
             )
             self.assertEqual(utils.planet_value(species, planet), value)
+
+
+class HabitabilityTestCase(unittest.TestCase):
+    def setUp(self):
+        self.manager = engine.Manager()
+        self.manager._entity_registry = {
+            'species': {
+                'metadata': components.MetadataComponent(),
+                'species': components.SpeciesComponent(),
+            },
+        }
+        engine.Entity.register_manager(self.manager)
+
+    def test_table(self):
+        rng = random.Random(0)
+        for _ in range(50):
+            tolerances = []
+            for env in utils.ENVIRONMENTS:
+                if rng.random() < 0.2:
+                    tolerances.append((True, None, None))
+                else:
+                    _min = rng.randint(0, 98)
+                    tolerances.append((False, _min, rng.randint(_min + 2, 100)))
+            tolerances = tuple(tolerances)
+
+            table = utils.habitability_table(tolerances)
+            self.assertIs(utils.habitability_table(tolerances), table)
+            for _ in range(200):
+                environment = tuple(rng.randint(0, 100) for env in utils.ENVIRONMENTS)
+                self.assertEqual(table(environment), utils.environment_value(tolerances, environment))
+
+    def test_undefined_rating(self):
+        table = utils.habitability_table(((False, 50, 50), (True, None, None), (True, None, None)))
+
+        self.assertEqual(table((60, 0, 0)), -10)
+        with self.assertRaises(ZeroDivisionError):
+            table((50, 0, 0))
+
+    def test_changed_tolerances(self):
+        species = engine.Entity(
+            type='species', name='Human', plural_name='Humans', growth_rate=15,
+            gravity_immune=False, gravity_min=32, gravity_max=86, temperature_immune=True, radiation_immune=True,
+        )
+        self.assertEqual(utils.habitability(species)((20, 50, 50)), -12)
+
+        species.gravity_min = 10
+        self.assertEqual(utils.habitability(species)((20, 50, 50)), 64)
+
+
+class PlanetValuesTestCase(unittest.TestCase):
+    def test_planet_values(self):
+        state = {
+            'turn': 2500, 'width': 1000, 'seq': 4,
+            'entities': [
+                {'pk': 0, 'type': 'species', 'name': 'Human', 'plural_name': 'Humans', 'growth_rate': 15,
+                 'gravity_immune': False, 'gravity_min': 32, 'gravity_max': 86,
+                 'temperature_immune': False, 'temperature_min': 10, 'temperature_max': 64,
+                 'radiation_immune': False, 'radiation_min': 38, 'radiation_max': 90},
+                {'pk': 1, 'type': 'planet', 'x': 0, 'y': 0, 'gravity': 59, 'temperature': 37, 'radiation': 64,
+                 'ironium_conc': 50, 'boranium_conc': 50, 'germanium_conc': 50},
+                {'pk': 2, 'type': 'planet', 'x': 0, 'y': 0, 'gravity': 19, 'temperature': 78, 'radiation': 3,
+                 'ironium_conc': 50, 'boranium_conc': 50, 'germanium_conc': 50},
+                {'pk': 3, 'type': 'ship', 'x': 0, 'y': 0},
+            ]
+        }
+        for storage in engine.Manager.STORAGE_TYPES:
+            S = engine.GameState(state, {}, storage=storage)
+            species = S.manager.get_entity('species', 0)
+
+            self.assertEqual(utils.planet_values(species, S.manager), {1: 100, 2: -42})
@@ -0,0 +1,90 @@
+import copy
+import itertools
+import random
+import unittest
+
+from universe import engine, views
+
+
+def species(pk, name):
+    return {'pk': pk, 'type': 'species', 'name': name, 'plural_name': name + 's', 'growth_rate': 15,
+            'gravity_immune': True, 'temperature_immune': True, 'radiation_immune': True}
+
+
+def planet(pk, x, y, **kwargs):
+    return dict({'pk': pk, 'type': 'planet', 'x': x, 'y': y, 'gravity': 50, 'temperature': 50,
+                 'radiation': 50, 'ironium_conc': 50, 'boranium_conc': 50, 'germanium_conc': 50}, **kwargs)
+
+
+class ViewsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.state = {
+            'turn': 2500, 'width': 1000, 'seq': 9,
+            'entities': [
+                species(0, 'Human'),
+                species(1, 'Cylon'),
+                planet(2, 100, 100, owner_id=0, population=1000),
+                planet(3, 500, 500, owner_id=1, population=1000),
+                planet(4, 160, 180),  # 100 light-years from pk 2
+                planet(5, 161, 180),
+                {'pk': 6, 'type': 'ship', 'x': 560, 'y': 420, 'owner_id': 0},
+                {'pk': 7, 'type': 'ship', 'x': 900, 'y': 900, 'owner_id': 1},
+                {'pk': 8, 'type': 'movement_order', 'actor_id': 7, 'seq': 0, 'x_t': 990, 'y_t': 900, 'warp': 1},
+            ]
+        }
+
+    def test_views(self):
+        S = engine.GameState(copy.deepcopy(self.state), {})
+        result = S.generate_views()
+
+        self.assertEqual(sorted(result), [0, 1])
+        pks = {player: [entity['pk'] for entity in view['entities']] for player, view in result.items()}
+        # Each player sees its own objects, the species, and whatever is in range: pk 6 and pk 3 see
+        # each other, while pk 5 is just out of the range of pk 2.
+        self.assertEqual(pks[0], [0, 1, 2, 3, 4, 6])
+        self.assertEqual(pks[1], [0, 1, 3, 6, 7, 8])
+        self.assertEqual(result[0]['turn'], 2501)
+        self.assertEqual(result[0]['seq'], 9)
+
+    def test_shared(self):
+        S = engine.GameState(copy.deepcopy(self.state), {})
+        result = S.generate_views()
+
+        species = [view['entities'][0] for view in result.values()]
+        self.assertIs(species[0], species[1])
+
+    def test_matches_filter(self):
+        # The views agree with filtering the full state entity by entity, for each player in turn.
+        random.seed(0)
+        self.state['entities'].extend(
+            planet(pk, random.randint(0, 999), random.randint(0, 999), **({'owner_id': pk % 2} if pk % 3 else {}))
+            for pk in range(9, 300)
+        )
+        self.state['seq'] = 300
+        for storage, scan_range in itertools.product(engine.Manager.STORAGE_TYPES, (1, 7, 100, 300)):
+            expected = engine.GameState(copy.deepcopy(self.state), {}, storage=storage).generate()
+            S = engine.GameState(copy.deepcopy(self.state), {}, storage=storage)
+            result = S.generate_views(scan_range=scan_range)
+
+            owners = {entity['pk']: entity.get('owner_id') for entity in expected['entities']}
+            for player, view in result.items():
+                scanners = [entity for entity in expected['entities']
+                            if 'x' in entity and entity.get('owner_id') == player]
+
+                def visible(entity):
+                    if 'x' in entity:
+                        return entity.get('owner_id') == player or any(
+                            (entity['x'] - s['x']) ** 2 + (entity['y'] - s['y']) ** 2 <= scan_range ** 2
+                            for s in scanners)
+                    if 'actor_id' in entity:
+                        return owners[entity['actor_id']] == player
+                    return True
+
+                self.assertEqual(view['entities'], [entity for entity in expected['entities'] if visible(entity)],
+                                 (storage, scan_range))
+
+    def test_no_players(self):
+        state = dict(self.state, entities=[planet(0, 0, 0)])
+        S = engine.GameState(state, {})
+        self.assertEqual(S.generate_views(), {})
+        self.assertEqual(views.generate(S.manager), {})
@@ -0,0 +1,312 @@
+"""A compact binary format for game states.
+
+The layout of each entity type comes from the fields of its registered components.  Entities are
+stored a column per field: primary keys as delta encoded varints, integers and booleans as arrays of
+the narrowest fixed width that holds them, and strings as indexes into a table of distinct strings.
+Anything that does not fit its field's column type is kept as JSON text in the string table, so that
+reading a state back always gives the same entities that were written.
+
+The file is laid out as::
+
+    magic, version
+    headers     the state's keys other than 'entities', as JSON text
+    strings     the string table
+    schema      each entity type's name, and the data name and column kind of each of its fields
+    order       the entity type of each entity, in their original order
+    columns     for each entity type, its count and then a column per field
+"""
+import json
+import sys
+from array import array
+
+from . import fields
+
+
+MAGIC = b'UNV\x00'
+VERSION = 1
+
+# Column kinds.
+PK, INT, BOOL, STRING, JSON = range(5)
+
+# Presence of a column's values.
+NONE, ALL, SOME = range(3)
+
+INT_TYPECODES = ('b', 'h', 'i', 'q')
+
+
+def _kind(field):
+    if isinstance(field, fields.PrimaryKey):
+        return PK
+    if isinstance(field, fields.BooleanField):
+        return BOOL
+    if isinstance(field, (fields.IntField, fields.Reference)):
+        return INT
+    if isinstance(field, fields.CharField):
+        return STRING
+    return JSON
+
+
+def schema(manager, _type):
+    """The data name and column kind of each field of an entity type, in serialized order."""
+    names = {}
+    for component in manager._entity_registry[_type].values():
+        for field in component._fields.values():
+            names.setdefault(field.data_name, _kind(field))
+    return list(names.items())
+
+
+def _write_varint(out, value):
+    while value > 0x7f:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, position):
+    result = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, position
+        shift += 7
+
+
+def _zigzag(value):
+    return value << 1 if value >= 0 else (-value << 1) - 1
+
+
+def _unzigzag(value):
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def _write_array(out, values):
+    if sys.byteorder != 'little':
+        values.byteswap()
+    out.append(ord(values.typecode))
+    out.extend(values.tobytes())
+
+
+def _read_array(data, position, count):
+    values = array(chr(data[position]))
+    position += 1
+    end = position + count * values.itemsize
+    values.frombytes(data[position:end])
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values, end
+
+
+def _int_array(values):
+    # The narrowest signed array holding every value, or None if they do not all fit in 64 bits.
+    if not values:
+        return array('b')
+    low, high = min(values), max(values)
+    for typecode in INT_TYPECODES:
+        bits = 8 * array(typecode).itemsize - 1
+        if -(1 << bits) <= low and high < (1 << bits):
+            return array(typecode, values)
+    return None
+
+
+class _Strings:
+    def __init__(self):
+        self.index = {}
+
+    def __call__(self, value):
+        return self.index.setdefault(value, len(self.index))
+
+
+def _encode_column(out, kind, values, strings):
+    # Fall back to JSON text if any of the values is not exactly what the column kind stores.
+    expected = {PK: int, INT: int, BOOL: bool, STRING: str}.get(kind)
+    if not set(map(type, values)) <= {expected}:
+        kind = JSON
+    if kind == PK and min(values) < 0:
+        kind = INT
+    if kind == INT:
+        packed = _int_array(values)
+        if packed is None:
+            kind = JSON
+
+    out.append(kind)
+    if kind == PK:
+        previous = 0
+        for value in values:
+            _write_varint(out, _zigzag(value - previous))
+            previous = value
+    elif kind == INT:
+        _write_array(out, packed)
+    elif kind == BOOL:
+        out.extend(bytes(values))
+    elif kind == STRING:
+        _write_array(out, _int_array([strings(value) for value in values]))
+    else:
+        _write_array(out, _int_array([strings(json.dumps(value)) for value in values]))
+
+
+def _decode_column(data, position, count, table):
+    kind = data[position]
+    position += 1
+    if kind == PK:
+        values, previous = [], 0
+        for _ in range(count):
+            value, position = _read_varint(data, position)
+            previous += _unzigzag(value)
+            values.append(previous)
+        return values, position
+    if kind == INT:
+        values, position = _read_array(data, position, count)
+        return values.tolist(), position
+    if kind == BOOL:
+        return [bool(value) for value in data[position:position + count]], position + count
+    indexes, position = _read_array(data, position, count)
+    if kind == STRING:
+        return [table[index] for index in indexes], position
+    return [json.loads(table[index]) for index in indexes], position
+
+
+def dumps(state, manager):
+    """Encode a state, such as the output of GameState.generate, using the manager's entity types."""
+    headers = {key: value for key, value in state.items() if key != 'entities'}
+    strings = _Strings()
+
+    types, rows, order = {}, [], array('B')
+    for entity in state.get('entities', ()):
+        _type = entity['type']
+        if _type not in types:
+            if _type not in manager._entity_registry:
+                raise ValueError(f"{_type!r} is not a registered entity type.")
+            types[_type] = len(types)
+            rows.append([])
+        if len(types) > 256 and order.typecode == 'B':
+            order = array('H', order)
+        order.append(types[_type])
+        rows[types[_type]].append(entity)
+
+    body = bytearray()
+    _write_varint(body, len(order))
+    _write_array(body, order)
+    schemas = [schema(manager, _type) for _type in types]
+    for _type, entities, _schema in zip(types, rows, schemas):
+        names = {name for name, _kind in _schema}
+        for entity in entities:
+            if not entity.keys() <= names:
+                raise ValueError(f"{_type!r} entities have no fields {sorted(entity.keys() - names)!r}.")
+
+        _write_varint(body, len(entities))
+        for name, kind in _schema:
+            present = [name in entity for entity in entities]
+            if all(present):
+                body.append(ALL)
+            elif any(present):
+                body.append(SOME)
+                body.extend(bytes(present))
+            else:
+                body.append(NONE)
+                continue
+            _encode_column(body, kind, [entity[name] for entity in entities if name in entity], strings)
+
+    out = bytearray(MAGIC)
+    _write_varint(out, VERSION)
+    header = json.dumps(headers).encode('utf-8')
+    _write_varint(out, len(header))
+    out.extend(header)
+
+    # The schema's names go in the string table too, so it has to be filled in before it is written.
+    names = [(strings(_type), [(strings(name), kind) for name, kind in _schema])
+             for _type, _schema in zip(types, schemas)]
+    _write_varint(out, len(strings.index))
+    for string in strings.index:
+        encoded = string.encode('utf-8')
+        _write_varint(out, len(encoded))
+        out.extend(encoded)
+    _write_varint(out, len(names))
+    for _type, _schema in names:
+        _write_varint(out, _type)
+        _write_varint(out, len(_schema))
+        for name, kind in _schema:
+            _write_varint(out, name)
+            out.append(kind)
+
+    out.extend(body)
+    return bytes(out)
+
+
+def loads(data):
+    """Decode a state, giving the same dict that was encoded, with 'entities' last."""
+    data = memoryview(data).cast('B')
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a binary game state.")
+    version, position = _read_varint(data, len(MAGIC))
+    if version != VERSION:
+        raise ValueError(f"Unsupported binary game state version {version}.")
+
+    size, position = _read_varint(data, position)
+    state = json.loads(bytes(data[position:position + size]).decode('utf-8'))
+    position += size
+
+    count, position = _read_varint(data, position)
+    table = []
+    for _ in range(count):
+        size, position = _read_varint(data, position)
+        table.append(bytes(data[position:position + size]).decode('utf-8'))
+        position += size
+
+    count, position = _read_varint(data, position)
+    schemas = []
+    for _ in range(count):
+        _type, position = _read_varint(data, position)
+        size, position = _read_varint(data, position)
+        names = []
+        for _ in range(size):
+            name, position = _read_varint(data, position)
+            names.append(table[name])
+            position += 1  # the schema's kind; each column records the kind it was actually stored as
+        schemas.append(names)
+
+    count, position = _read_varint(data, position)
+    order, position = _read_array(data, position, count)
+
+    missing = object()
+    rows = []
+    for names in schemas:
+        count, position = _read_varint(data, position)
+        present_names, columns, partial = [], [], False
+        for name in names:
+            presence = data[position]
+            position += 1
+            if presence == NONE:
+                continue
+            present = None
+            if presence == SOME:
+                present = data[position:position + count]
+                position += count
+            values, position = _decode_column(data, position, count if present is None else sum(present), table)
+            if present is not None:
+                values = iter(values)
+                values = [next(values) if flag else missing for flag in present]
+                partial = True
+            present_names.append(name)
+            columns.append(values)
+
+        if partial:
+            entities = [
+                {name: value for name, value in zip(present_names, row) if value is not missing}
+                for row in zip(*columns)
+            ]
+        else:
+            entities = [dict(zip(present_names, row)) for row in zip(*columns)]
+        rows.append(iter(entities))
+
+    state['entities'] = [next(rows[index]) for index in order]
+    return state
+
+
+def write_state(fp, state, manager):
+    fp.write(dumps(state, manager))
+
+
+def read_state(fp):
+    return loads(fp.read())
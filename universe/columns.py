@@ -0,0 +1,174 @@
+from array import array
+from itertools import compress
+from operator import itemgetter
+
+from . import fields
+
+
+ABSENT, PRESENT, OBJECT = 0, 1, 2
+
+
+class Column:
+    """Storage for a single field of a component, with one row per entity.
+
+    Rows that the field is not set on are marked as absent, so that a stored None can still be told
+    apart from a missing value.
+    """
+
+    def __init__(self):
+        self.values = []
+        self.state = bytearray()
+
+    def __len__(self):
+        return len(self.state)
+
+    def _own(self):
+        # Copy storage mapped in from a save file into memory, so that it can grow.
+        if not isinstance(self.state, bytearray):
+            self.state = bytearray(self.state)
+
+    def _extend(self, count):
+        self.values.extend([None] * count)
+
+    def extend(self, size):
+        if size > len(self.state):
+            self._own()
+            self._extend(size - len(self.state))
+            self.state.extend(bytes(size - len(self.state)))
+
+    def get(self, row, default=None):
+        if self.state[row] == ABSENT:
+            return default
+        return self.values[row]
+
+    def set(self, row, value):
+        self.values[row] = value
+        self.state[row] = PRESENT
+
+    def discard(self, row):
+        if self.state[row] == ABSENT:
+            raise KeyError(row)
+        self.values[row] = None
+        self.state[row] = ABSENT
+
+    def take(self, rows):
+        get = self.get
+        return [get(row) for row in rows]
+
+
+class TypedColumn(Column):
+    """A column packing its values into an array of a fixed C type.
+
+    Values that do not fit the array, e.g. an out of range integer or something that has yet to be
+    validated, are kept aside as Python objects.
+    """
+    typecode = 'q'
+    kind = int
+
+    def __init__(self):
+        self.values = array(self.typecode)
+        self.state = bytearray()
+        self.objects = {}
+
+    def _own(self):
+        super()._own()
+        if not isinstance(self.values, array):
+            values = array(self.typecode)
+            values.frombytes(self.values.cast('B'))
+            self.values = values
+
+    def _extend(self, count):
+        self.values.frombytes(bytes(count * self.values.itemsize))
+
+    def get(self, row, default=None):
+        state = self.state[row]
+        if state == PRESENT:
+            return self.values[row]
+        if state == OBJECT:
+            return self.objects[row]
+        return default
+
+    def set(self, row, value):
+        if type(value) is self.kind:
+            try:
+                self.values[row] = value
+            except (OverflowError, ValueError):  # a mapped column rejects out of range values with ValueError
+                pass
+            else:
+                if self.state[row] == OBJECT:
+                    del self.objects[row]
+                self.state[row] = PRESENT
+                return
+        self.objects[row] = value
+        self.state[row] = OBJECT
+
+    def discard(self, row):
+        state = self.state[row]
+        if state == ABSENT:
+            raise KeyError(row)
+        if state == OBJECT:
+            del self.objects[row]
+        self.values[row] = 0
+        self.state[row] = ABSENT
+
+    def take(self, rows):
+        if len(rows) < 2:
+            return super().take(rows)
+        # Gather straight out of the array when every requested row holds a packed value.
+        getter = itemgetter(*rows)
+        if getter(self.state).count(PRESENT) == len(rows):
+            return list(getter(self.values))
+        return super().take(rows)
+
+
+class BooleanColumn(TypedColumn):
+    typecode = 'b'
+    kind = bool
+
+    def get(self, row, default=None):
+        state = self.state[row]
+        if state == PRESENT:
+            return bool(self.values[row])
+        if state == OBJECT:
+            return self.objects[row]
+        return default
+
+    def take(self, rows):
+        return Column.take(self, rows)
+
+
+def column_for(field):
+    # Primary keys stay as Python objects, since they are handed out as dictionary keys on every read.
+    if isinstance(field, fields.BooleanField):
+        return BooleanColumn()
+    if isinstance(field, (fields.IntField, fields.Reference)):
+        return TypedColumn()
+    return Column()
+
+
+class ComponentTable:
+    """The columns of every field of a component, indexed by the manager's dense entity rows.
+
+    A table's arrays may be views onto a memory mapped save file, see the mapped module; they are only
+    copied into memory once the table has to grow.
+    """
+
+    def __init__(self, component):
+        self.component = component
+        self.columns = {field.data_name: column_for(field) for field in component._fields.values()}
+        self.live = bytearray()
+
+    def __len__(self):
+        return len(self.live)
+
+    def extend(self, size):
+        if size > len(self.live):
+            if not isinstance(self.live, bytearray):
+                self.live = bytearray(self.live)
+            self.live.extend(bytes(size - len(self.live)))
+            for column in self.columns.values():
+                column.extend(size)
+
+    def rows(self):
+        """The rows of the entities currently registered with this component, in row order."""
+        return list(compress(range(len(self.live)), self.live))
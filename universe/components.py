@@ -1,7 +1,7 @@
 import math
 import random
 
-from . import fields, exceptions
+from . import engine, fields, exceptions
 
 
 class MetaComponent(type):
@@ -17,26 +17,103 @@ class MetaComponent(type):
                 new_attrs[name] = f
 
         new_class = super_new(cls, name, bases, new_attrs, **kwargs)
+        new_class._validate_fields = cls.compile_validator(new_class)
+        new_class._validate_columns = cls.compile_column_validator(new_class)
         return new_class
 
+    @staticmethod
+    def compile_validator(component):
+        """Build the function validating every field of a component, along with its ``validate_<name>`` hooks.
+
+        Field validators and hooks are resolved once here, rather than on every call.
+        """
+        checks = tuple(
+            (field.validator(), getattr(component, f'validate_{name}', None))
+            for name, field in component._fields.items()
+        )
+        if not any(hook for _check, hook in checks):
+            checks = tuple(check for check, _hook in checks)
+
+            def validate_fields(self, data, manager=None):
+                for check in checks:
+                    check(data, manager)
+            return validate_fields
+
+        def validate_fields(self, data, manager=None):
+            for check, hook in checks:
+                check(data, manager)
+                if hook is not None:
+                    hook(self, data)
+        return validate_fields
+
+    @staticmethod
+    def compile_column_validator(component):
+        """Build the function validating every field of a component across a list of data mappings.
+
+        Each field is checked a column at a time, then its ``validate_<name>`` hook is run on the rows
+        that passed.  Returns the index and message of every failure.
+        """
+        checks = tuple(
+            (field.column_validator(), getattr(component, f'validate_{name}', None))
+            for name, field in component._fields.items()
+        )
+
+        def validate_columns(self, rows, manager=None):
+            errors = []
+            for check, hook in checks:
+                failures = check(rows, manager)
+                errors.extend(failures)
+                if hook is None:
+                    continue
+                failed = {index for index, _message in failures}
+                for index, data in enumerate(rows):
+                    if index in failed:
+                        continue
+                    try:
+                        hook(self, data)
+                    except exceptions.ValidationError as e:
+                        errors.append((index, str(e)))
+            return errors
+        return validate_columns
 
-class Component(metaclass=MetaComponent):
-    def validate(self, data):
-        for name, field in self._fields.items():
-            field.validate(data)
-            if hasattr(self, f'validate_{name}'):
-                getattr(self, f'validate_{name}')(data)
 
-    def serialize(self, data):
+class Component(metaclass=MetaComponent):
+    def validate(self, data, manager=None):
+        """Validate a data mapping, checking any references against manager, by default Entity's."""
+        self._validate_fields(data, manager)
+        self.check(data, manager)
+
+    def check(self, data, manager):
+        """Override for checks spanning several fields, run once every field has passed on its own."""
+
+    def validate_rows(self, rows, manager=None):
+        """Validate a list of data mappings at once, returning the index and message of every failure.
+
+        Unlike validate, this does not stop at the first failure.  Rows that pass every field are then
+        put through check, for components that override it.
+        """
+        errors = self._validate_columns(rows, manager)
+        if type(self).check is not Component.check:
+            failed = {index for index, _message in errors}
+            for index, data in enumerate(rows):
+                if index in failed:
+                    continue
+                try:
+                    self.check(data, manager)
+                except exceptions.ValidationError as e:
+                    errors.append((index, str(e)))
+        return errors
+
+    def serialize(self, data, manager=None):
         output = {}
-        self.validate(data)
+        self.validate(data, manager)
         for field in self._fields.values():
             output.update(field.serialize(data))
         return output
 
-    def display(self, data):
+    def display(self, data, manager=None):
         output = {}
-        self.validate(data)
+        self.validate(data, manager)
         for name, field in self._fields.items():
             if name in data:
                 value = data[name]
@@ -84,9 +161,7 @@ class SpeciesComponent(Component):
     radiation_max = fields.IntField(min=0, max=100, required=False)
     radiation_immune = fields.BooleanField()
 
-    def validate(self, data):
-        super().validate(data)
-
+    def check(self, data, manager):
         if data['gravity_immune']:
             if 'gravity_min' in data or 'gravity_max' in data:
                 raise exceptions.ValidationError(
@@ -196,12 +271,10 @@ class MovementComponent(Component):
     y_t = fields.IntField(required=False)
     target = fields.Reference(types=['planet', 'ship'], required=False)
 
-    def validate(self, data):
-        super().validate(data)
-
-        from .engine import Entity
-        actor = Entity.manager.get_entity('metadata', data['actor_id'])
-        if actor.type != 'ship':
+    def check(self, data, manager):
+        if manager is None:
+            manager = engine.Entity.manager
+        if data.get('actor_id') not in manager.get_pks('ship'):
             raise exceptions.ValidationError("The acting object must be a ship.")
 
         if data['actor_id'] == data.get('target_id'):
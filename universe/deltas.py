@@ -0,0 +1,36 @@
+"""Turn deltas, as produced by GameState.generate_delta.
+
+A delta holds the new state's headers along with:
+
+    created     the serialized entities registered over the turn
+    modified    for each other entity whose fields changed, its pk, the fields set and those unset
+    removed     the pks of the entities unregistered over the turn
+"""
+
+CHANGES = ('created', 'modified', 'removed')
+
+
+def apply(state, delta):
+    """Rebuild a full state from the state a turn started from and the delta it produced.
+
+    The base state is left untouched.
+    """
+    removed = set(delta['removed'])
+    modified = {change['pk']: change for change in delta['modified']}
+
+    entities = []
+    for entity in state['entities']:
+        if entity['pk'] in removed:
+            continue
+        change = modified.get(entity['pk'])
+        if change is not None:
+            entity = dict(entity)
+            entity.update(change['set'])
+            for name in change['unset']:
+                entity.pop(name, None)
+        entities.append(entity)
+    entities.extend(delta['created'])
+
+    new = {key: value for key, value in delta.items() if key not in CHANGES}
+    new['entities'] = entities
+    return new
@@ -1,70 +1,296 @@
 import weakref
 
-from . import components, systems, exceptions
+from . import columns, components, fields, indexes, mapped, spatial, systems, exceptions, streaming, views
 
 
-class Entity:
-    def __init__(self, **kwargs):
-        self.__dict__.update(kwargs)
-        self._components = Entity.manager._entity_registry[kwargs['type']]
+# Stands in for the value of a field that is not set, where None could be a stored value.
+MISSING = object()
 
-    def __getattr__(self, name):
-        for component in self.__dict__.get('_components', {}).values():
-            for field in component._fields.values():
-                if name == field.data_name:
-                    return self.__dict__.get(name)
-                if name == field.name:
-                    return field.from_data(self.__dict__)
+
+class FieldValue:
+    """Data descriptor for the stored value of a field, under the field's data name.
+
+    ``indexes`` holds the manager's indexes over the field.  While the entity is registered, each
+    write takes it out of them beforehand, as they find it by the stored value, and puts it back after.
+    An entity can outlive its manager, e.g. one kept after its game is done with, and is then written
+    with nothing left to track or index.
+    """
+    indexes = ()
+
+    def __init__(self, field):
+        self.field = field
+        self.data_name = field.data_name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return instance.__dict__.get(self.data_name)
+
+    def __set__(self, instance, value):
+        try:
+            tracking = instance.manager._tracking
+        except ReferenceError:
+            tracking = None
+        old = self.load(instance, MISSING) if tracking else None
+        indexed = tracking is not None and self.unindex(instance)
+        try:
+            self.store(instance, self.field.to_data(value))
+        except exceptions.empty:
+            try:
+                self.discard(instance)
+            except AttributeError:
+                pass
+        if indexed:
+            self.reindex(instance)
+        if tracking:
+            self.touch(instance, old)
+
+    def __delete__(self, instance):
         try:
-            return self.__dict__[name]
+            tracking = instance.manager._tracking
+        except ReferenceError:
+            tracking = None
+        old = self.load(instance, MISSING) if tracking else None
+        indexed = tracking is not None and self.unindex(instance)
+        try:
+            self.discard(instance)
+        finally:
+            if indexed:
+                self.reindex(instance)
+        if tracking:
+            self.touch(instance, old)
+
+    def unindex(self, instance):
+        # Take a registered entity out of the indexes over the field, returning whether it was.
+        if not self.indexes or not instance.manager._indexed(instance):
+            return False
+        for index in self.indexes:
+            index.discard(instance)
+        return True
+
+    def reindex(self, instance):
+        for index in self.indexes:
+            index.add(instance)
+
+    def touch(self, instance, old):
+        # Record a write that changed the stored value, while the manager tracks the changes of a turn.
+        new = self.load(instance, MISSING)
+        if new is not old and (type(new) is not type(old) or new != old):
+            instance.manager._modified.setdefault(instance, set()).add(self.data_name)
+
+    def load(self, instance, default=None):
+        return instance.__dict__.get(self.data_name, default)
+
+    def store(self, instance, value):
+        instance.__dict__[self.data_name] = value
+
+    def discard(self, instance):
+        try:
+            del instance.__dict__[self.data_name]
         except KeyError:
-            raise AttributeError(f"{self.__class__.__name__!r} object has no attribute {name!r}")
+            raise AttributeError(self.data_name)
 
-    def __setattr__(self, name, value):
-        for component in self.__dict__.get('_components', {}).values():
-            for field in component._fields.values():
-                if name in (field.data_name, field.name):
-                    try:
-                        self.__dict__[field.data_name] = field.to_data(value)
-                    except exceptions.empty:
-                        self.__dict__.pop(field.data_name, None)
-                    return
-        self.__dict__[name] = value
-
-    def __delattr__(self, name):
-        for component in self.__dict__.get('_components', {}).values():
-            for field in component._fields.values():
-                if name in (field.data_name, field.name):
-                    self.__dict__.pop(field.data_name)
-                    return
-        del self.__dict__[name]
+
+class SlotValue(FieldValue):
+    """Data descriptor for the stored value of a field kept in one of the entity's slots."""
+
+    def __init__(self, field, member):
+        super().__init__(field)
+        self.member = member
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        try:
+            return self.member.__get__(instance)
+        except AttributeError:
+            return None
+
+    def load(self, instance, default=None):
+        try:
+            return self.member.__get__(instance)
+        except AttributeError:
+            return default
+
+    def store(self, instance, value):
+        self.member.__set__(instance, value)
+
+    def discard(self, instance):
+        self.member.__delete__(instance)
+
+
+class ColumnValue(FieldValue):
+    """Data descriptor for the stored value of a field kept in a column of the manager's tables."""
+
+    def __init__(self, field, column):
+        super().__init__(field)
+        self.column = column
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return self.column.get(instance._row)
+
+    def load(self, instance, default=None):
+        return self.column.get(instance._row, default)
+
+    def store(self, instance, value):
+        self.column.set(instance._row, value)
+
+    def discard(self, instance):
+        try:
+            self.column.discard(instance._row)
+        except KeyError:
+            raise AttributeError(self.data_name)
+
+
+class FieldAttribute:
+    """Data descriptor for a field under its own name, e.g. a Reference resolved to its entity."""
+
+    def __init__(self, value):
+        self.value = value
+        self.field = value.field
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return self.field.to_python(self.value.load(instance))
+
+    def __set__(self, instance, value):
+        self.value.__set__(instance, value)
+
+    def __delete__(self, instance):
+        self.value.__delete__(instance)
+
+
+class Entity:
+    __slots__ = ()
+
+    _type = None
+    _components = {}
+    _fields = {}
+    _references = ()
+
+    def __new__(cls, **kwargs):
+        if cls is Entity:
+            cls = Entity.manager.get_entity_class(kwargs['type'])
+        return super().__new__(cls)
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
 
     def __contains__(self, key):
         return key in self._components
 
+    def _data(self):
+        return self.__dict__
+
     def validate(self):
+        data = self._data()
         for component in self._components.values():
-            component.validate(self.__dict__)
+            component.validate(data, self.manager)
 
     def serialize(self):
-        data = {}
+        data, output = self._data(), {}
         for _type, component in self._components.items():
-            data.update(component.serialize(self.__dict__))
-        return data
+            output.update(component.serialize(data, self.manager))
+        return output
 
     @classmethod
     def register_manager(cls, manager):
         cls.manager = weakref.proxy(manager)
 
 
+class CompactEntity(Entity):
+    """An entity keeping its declared fields in slots, with anything else in an overflow __dict__.
+
+    The instance __dict__ is only allocated once an undeclared attribute is first set, e.g. the
+    transient vectors used by the movement system.
+    """
+    __slots__ = ()
+
+    _slots = {}
+
+    def __init__(self, **kwargs):
+        for name, value in kwargs.items():
+            member = self._slots.get(name)
+            if member is not None:
+                member.__set__(self, value)
+            else:
+                self.__dict__[name] = value
+
+    def _data(self):
+        data = {}
+        for name, member in self._slots.items():
+            try:
+                data[name] = member.__get__(self)
+            except AttributeError:
+                pass
+        return data
+
+
+class ColumnarEntity(Entity):
+    """A thin view onto one row of the manager's component tables.
+
+    Undeclared attributes still go into an instance __dict__, allocated on first use.
+    """
+    __slots__ = ('_row',)
+
+    _values = {}
+
+    def __init__(self, **kwargs):
+        self.manager._allocate_row(self)
+        for name, value in kwargs.items():
+            descriptor = self._values.get(name)
+            if descriptor is not None:
+                descriptor.column.set(self._row, value)
+            else:
+                self.__dict__[name] = value
+
+    def _data(self):
+        row = self._row
+        return {
+            name: descriptor.column.get(row)
+            for name, descriptor in self._values.items() if descriptor.column.state[row]
+        }
+
+
 class Manager:
-    def __init__(self):
+    STORAGE_TYPES = ('dict', 'compact', 'columnar')
+
+    def __init__(self, storage='dict', width=None):
+        if storage not in self.STORAGE_TYPES:
+            raise ValueError("{} is not a supported storage type.".format(storage))
+        self.storage = storage
+
         self._seq = 0
         self._components = {}
+        # The pks of the registered entities of each type, for checking references a column at a time.
+        self._types = {}
+        # The entities with a position component, by where they are; see the spatial module.
+        self.spatial = spatial.Grid.for_width(width)
+        self.locations = spatial.Locations()
+        # The entities referring to each pk, by the data name of the Reference field; see get_referrers.
+        self._references = {}
         self._systems = []
         self._updates = []
 
+        # Set for the duration of process(), for systems that can farm their work out to other processes.
+        self.executor = None
+
+        # The changes made by the last process(): the entities created, the pks of those removed, and
+        # the data names written on each entity.  Changes are only recorded while it runs.
+        self._tracking = False
+        self._created = {}
+        self._removed = []
+        self._modified = {}
+
         self._entity_registry = {}
+        self._entity_classes = {}
+
+        # Only used by columnar storage: the entity owning each row, and the table for each component.
+        self._rows = []
+        self._tables = {}
 
     def register_system(self, system):
         self._systems.append(system)
@@ -74,47 +300,238 @@ class Manager:
             raise ValueError("{} is already a registered entity type.".format(name))
         _components.append(components.MetadataComponent())
         self._entity_registry[name] = {component._name: component for component in _components}
+        self._entity_classes[name] = self._build_entity_class(name, self._entity_registry[name])
+
+    def _build_entity_class(self, name, _components):
+        # Install a descriptor for both the attribute name and the stored data name of every field,
+        # with the first component to declare a name taking precedence.
+        fields, declared_by = {}, {}
+        for component in _components.values():
+            for field in component._fields.values():
+                declared_by.setdefault(field.data_name, component)
+                fields.setdefault(field.data_name, field)
+                fields.setdefault(field.name, field)
+        data_names = [data_name for data_name, field in fields.items() if data_name == field.data_name]
+
+        attrs = {'_type': name, '_components': _components, '_fields': fields}
+        class_name = ''.join(part.capitalize() for part in name.split('_')) + 'Entity'
+        if self.storage == 'compact':
+            attrs['__slots__'] = tuple(data_names) + ('__dict__',)
+            cls = type(class_name, (CompactEntity,), attrs)
+            cls._slots = {data_name: cls.__dict__[data_name] for data_name in data_names}
+            values = {data_name: SlotValue(fields[data_name], member) for data_name, member in cls._slots.items()}
+        elif self.storage == 'columnar':
+            attrs['__slots__'] = ('__dict__',)
+            attrs['_tables'] = tuple(self.get_table(component) for component in _components.values())
+            cls = type(class_name, (ColumnarEntity,), attrs)
+            values = {
+                data_name: ColumnValue(
+                    fields[data_name], self.get_table(declared_by[data_name]).columns[data_name])
+                for data_name in data_names
+            }
+            cls._values = values
+        else:
+            cls = type(class_name, (Entity,), attrs)
+            values = {data_name: FieldValue(fields[data_name]) for data_name in data_names}
+
+        if 'position' in _components:
+            for data_name in ('x', 'y'):
+                values[data_name].indexes += (self.spatial, self.locations)
+        cls._references = self._index_references(values)
+
+        # Bind the class to this manager, so that its entities record their changes and allocate their
+        # rows here even once another manager has been registered with Entity.
+        cls.manager = weakref.proxy(self)
+
+        for attr_name, field in fields.items():
+            if attr_name == field.data_name:
+                setattr(cls, attr_name, values[attr_name])
+            else:
+                setattr(cls, attr_name, FieldAttribute(values[field.data_name]))
+        return cls
+
+    def _index_references(self, values):
+        # Hook the descriptor of each Reference field up to the reverse index for its data name.
+        references = []
+        for data_name, value in values.items():
+            if isinstance(value.field, fields.Reference):
+                index = self._references.setdefault(data_name, indexes.References(data_name))
+                value.indexes += (index,)
+                references.append(index)
+        return tuple(references)
+
+    def get_entity_class(self, _type):
+        cls = self._entity_classes.get(_type)
+        if cls is None:
+            cls = self._entity_classes[_type] = self._build_entity_class(_type, self._entity_registry[_type])
+        return cls
+
+    def get_table(self, component):
+        table = self._tables.get(component._name)
+        if table is None:
+            table = self._tables[component._name] = columns.ComponentTable(component)
+            table.extend(len(self._rows))
+        return table
+
+    def _allocate_row(self, entity):
+        # Rows are never reused, so that a view stays valid after its entity is unregistered.
+        entity._row = len(self._rows)
+        self._rows.append(entity)
+        for table in entity._tables:
+            table.extend(len(self._rows))
+
+    def _find_column(self, _type, name):
+        # Prefer the component's own field, then the first other component declaring that data name.
+        table = self._tables.get(_type)
+        if table is not None and name in table.columns:
+            return table.columns[name]
+        for table in self._tables.values():
+            if name in table.columns:
+                return table.columns[name]
+        raise KeyError(name)
 
     def get_entities(self, _type):
         return self._components.get(_type, {})
 
+    def get_columns(self, _type, names):
+        """Return the entities with the given component, along with a list of values for each named field.
+
+        Under columnar storage the values are gathered straight out of the component tables; otherwise
+        they are read off of each entity in turn.
+        """
+        if self.storage == 'columnar':
+            table = self._tables.get(_type)
+            rows = table.rows() if table is not None else []
+            entities = [self._rows[row] for row in rows]
+            return entities, [self._find_column(_type, name).take(rows) for name in names]
+
+        entities = list(self.get_entities(_type).values())
+        return entities, [[getattr(entity, name) for entity in entities] for name in names]
+
+    def get_pks(self, _type):
+        """The pks of every registered entity of the given entity type.
+
+        The set is kept up to date by the manager, and must not be modified.
+        """
+        return self._types.get(_type, frozenset())
+
+    def get_referrers(self, data_name, pk):
+        """The entities whose Reference field under data_name refers to pk, in the order they came to.
+
+        E.g. get_referrers('owner_id', species.pk) for everything a species owns, or
+        get_referrers('actor_id', ship.pk) for a ship's orders.
+        """
+        index = self._references.get(data_name)
+        return index.get(pk) if index is not None else []
+
+    def get_references(self, data_name):
+        """The reverse index of the Reference fields under data_name, see indexes.References."""
+        index = self._references.get(data_name)
+        return index if index is not None else indexes.References(data_name)
+
+    def _indexed(self, entity):
+        # Whether an entity is registered, and so kept in the manager's indexes.
+        return entity.pk is not None and self.get_entity('metadata', entity.pk) is entity
+
     def get_entity(self, _type, _id):
         return self._components.get(_type, {}).get(_id)
 
     def set_entity(self, _type, entity):
         self._components.setdefault(_type, {})[entity.pk] = entity
+        if self.storage == 'columnar':
+            self._tables[_type].live[entity._row] = 1
 
     def del_entity(self, _type, entity):
         self._components.setdefault(_type, {}).pop(entity.pk, None)
+        if self.storage == 'columnar':
+            self._tables[_type].live[entity._row] = 0
 
     def register_entity(self, entity):
         if not isinstance(entity, Entity):
-            entity = Entity(**entity)
+            entity = self.get_entity_class(entity['type'])(**entity)
         if entity.pk is None:
             entity.pk = self._seq
             self._seq += 1
         for component in entity._components:
             self.set_entity(component, entity)
+        self._types.setdefault(entity._type, set()).add(entity.pk)
+        if 'position' in entity._components:
+            self.spatial.add(entity)
+            self.locations.add(entity)
+        for index in entity._references:
+            index.add(entity)
+        if self._tracking:
+            self._created[entity] = None
 
         return entity
 
     def unregister_entity(self, entity):
+        pk = entity.pk
         for component in entity._components:
             self.del_entity(component, entity)
+        self._types.get(entity._type, set()).discard(pk)
+        if 'position' in entity._components:
+            self.spatial.discard(entity)
+            self.locations.discard(entity)
+        for index in entity._references:
+            index.discard(entity)
         entity.pk = None
-
-    def process(self):
-        for system_cls in self._systems:
-            system = system_cls()
-            system.process(self)
-
-    def import_data(self, data, updates):
+        if self._tracking:
+            # An entity both created and removed over the turn never needs to appear in its changes.
+            if self._created.pop(entity, True):
+                self._removed.append(pk)
+            self._modified.pop(entity, None)
+
+    def process(self, executor=None):
+        self.executor = executor
+        self._created, self._removed, self._modified = {}, [], {}
+        self._tracking = True
+        try:
+            for system_cls in self._systems:
+                system = system_cls()
+                system.process(self)
+        finally:
+            self.executor = None
+            self._tracking = False
+
+    def validate_entities(self):
+        """Validate every registered entity a component at a time, and return all of the failures.
+
+        Each failure is a (pk, component name, message) triple, ordered by entity and then by the
+        entity's components.  An entity may fail more than once, but only once per field.
+        """
+        metadata = self.get_entities('metadata')
+        rows = {pk: entity._data() for pk, entity in metadata.items()}
+        errors = []
+        for name, entities in self._components.items():
+            if not entities:
+                continue
+            component = next(iter(entities.values()))._components[name]
+            pks = list(entities)
+            for index, message in component.validate_rows([rows[pk] for pk in pks], self):
+                errors.append((pks[index], name, message))
+
+        order = {pk: index for index, pk in enumerate(metadata)}
+        errors.sort(key=lambda error: (order[error[0]], list(metadata[error[0]]._components).index(error[1])))
+        return errors
+
+    def import_data(self, data, updates, batch=False):
         if 'seq' in data:
             self._seq = data['seq']
-        for entity in (data.get('entities') or ()):
-            self.register_entity(entity)
-        for entity in self.get_entities('metadata').values():
-            entity.validate()
+        entities = data.get('entities') or ()
+        if isinstance(entities, mapped.MappedEntities) and self.storage == 'columnar':
+            # The save was validated as it was written.
+            entities.attach(self)
+        else:
+            for entity in entities:
+                self.register_entity(entity)
+
+            errors = self.validate_entities()
+            if errors and batch:
+                # Report every failure, so that a corrupt save can be repaired in one pass.
+                raise exceptions.ValidationErrors(errors)
+            if errors:
+                raise exceptions.ValidationError(errors[0][2])
 
         for species_id, S in updates.items():
             if self.get_entity('species', species_id) is None:
@@ -129,22 +546,50 @@ class Manager:
                     continue
                 self._updates.append(item)
 
+    def export_entities(self):
+        """Serialize the registered entities one at a time, for writing out without building the whole list."""
+        for entity in self.get_entities('metadata').values():
+            yield entity.serialize()
+
+    def export_delta(self):
+        """Serialize just the changes made by the last process(), see the deltas module."""
+        modified = []
+        for entity, names in self._modified.items():
+            if entity in self._created:
+                continue
+            data = entity.serialize()
+            modified.append({
+                'pk': entity.pk,
+                'set': {name: value for name, value in data.items() if name in names},
+                'unset': sorted(names - data.keys()),
+            })
+        return {
+            'seq': self._seq,
+            'created': [entity.serialize() for entity in self._created],
+            'modified': modified,
+            'removed': list(self._removed),
+        }
+
     def export_data(self):
         return {
             'seq': self._seq,
-            'entities': [entity.serialize() for entity in self.get_entities('metadata').values()]
+            'entities': list(self.export_entities())
         }
 
 
 class GameState:
-    def __init__(self, state, updates):
+    # Each entry is called with no arguments to get the system for a turn, so a host can configure one
+    # by overriding this with e.g. functools.partial(systems.MovementSystem, adaptive=True).
+    SYSTEMS = [systems.UpdateSystem, systems.MovementSystem, systems.PopulationGrowthSystem]
+
+    def __init__(self, state, updates, storage='dict', batch=False):
         self.old = state
         self.updates = updates
+        self.batch = batch
 
-        self.manager = Manager()
-        self.manager.register_system(systems.UpdateSystem)
-        self.manager.register_system(systems.MovementSystem)
-        self.manager.register_system(systems.PopulationGrowthSystem)
+        self.manager = Manager(storage=storage, width=state.get('width'))
+        for system in self.SYSTEMS:
+            self.manager.register_system(system)
 
         self.manager.register_entity_type('ship', [
             components.PositionComponent(),
@@ -167,20 +612,75 @@ class GameState:
             components.OrderComponent(),
             components.MovementComponent(),
         ])
-        Entity.register_manager(self.manager)
+        self.activate()
         self.load_data()
 
         self.new = {}
 
+    def activate(self):
+        """Register this game's manager with Entity.
+
+        Entities record their changes with, and are validated against, the manager their class was
+        built by, but references are still resolved to entities through the registered manager.  Each
+        turn generated registers its own game's first, so that games created later do not interfere.
+        """
+        Entity.register_manager(self.manager)
+
     def load_data(self):
-        self.manager.import_data(self.old, self.updates)
+        self.manager.import_data(self.old, self.updates, batch=self.batch)
+
+    def generate(self, executor=None):
+        """Generate the next turn.
 
-    def generate(self):
+        Passing a concurrent.futures executor, e.g. a ProcessPoolExecutor, lets the systems shard their
+        work across it.  The results are merged back in a fixed order, so they are identical to those
+        of a serial run.
+        """
+        self.activate()
         self.new_headers()
-        self.manager.process()
+        self.manager.process(executor)
         self.new.update(self.manager.export_data())
 
         return self.new
 
+    def generate_delta(self, executor=None):
+        """Generate the next turn, returning only what changed from the old state.
+
+        deltas.apply rebuilds what generate would have returned, from the old state and this delta.
+        """
+        self.activate()
+        self.new_headers()
+        self.manager.process(executor)
+        self.new.update(self.manager.export_delta())
+
+        return self.new
+
+    def generate_views(self, executor=None, scan_range=views.SCAN_RANGE):
+        """Generate the next turn, returning each player's view of it, keyed by the species' pk.
+
+        Each view is a state in the format generate returns, holding only the entities visible to that
+        player.  See the views module.
+        """
+        self.activate()
+        self.new_headers()
+        self.manager.process(executor)
+        self.new.update(seq=self.manager._seq)
+        return {
+            player: dict(self.new, entities=entities)
+            for player, entities in views.generate(self.manager, scan_range).items()
+        }
+
+    def generate_to(self, fp, executor=None, lines=False):
+        """Generate the next turn, streaming it to a text file instead of returning it.
+
+        The entities are serialized as they are written, so the new state is never held in memory as a
+        whole.  See streaming.write_state for the formats.
+        """
+        self.activate()
+        self.new_headers()
+        self.manager.process(executor)
+        self.new.update(seq=self.manager._seq)
+        streaming.write_state(fp, dict(self.new, entities=self.manager.export_entities()), lines=lines)
+
     def new_headers(self):
         self.new.update(turn=self.old['turn'] + 1, width=self.old['width'])
@@ -4,5 +4,13 @@ class ValidationError(Exception):
     pass
 
 
+class ValidationErrors(ValidationError):
+    """Every failure found by a batch validation, as a list of (pk, component name, message) triples."""
+
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} validation errors, the first being: {errors[0][2]}")
+        self.errors = errors
+
+
 class empty(Exception):
     pass
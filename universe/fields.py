@@ -2,6 +2,9 @@ from . import exceptions
 
 
 class Field:
+    # The exact types of value that column validation can check in bulk, or None to check row by row.
+    kinds = None
+
     def __init__(self, required=True):
         self.required = required
 
@@ -10,7 +13,10 @@ class Field:
         return self.name
 
     def from_data(self, data):
-        return data.get(self.data_name)
+        return self.to_python(data.get(self.data_name))
+
+    def to_python(self, value):
+        return value
 
     def to_data(self, value):
         return value
@@ -20,63 +26,137 @@ class Field:
             return {self.data_name: data[self.data_name]}
         return {}
 
-    def validate(self, data):
-        if self.required and self.data_name not in data:
-            raise exceptions.ValidationError(f"{self.data_name!r} is required.")
+    def validate(self, data, manager=None):
+        self.validator()(data, manager)
+
+    def validator(self):
+        """Return a function validating this field in a data mapping.
+
+        The function takes the mapping and the manager holding the entity, or None for the one
+        registered with Entity.  Everything the check depends on is looked up once, when the validator
+        is built, so that components can compile their fields' validators up front.
+        """
+        name, required = self.data_name, self.required
+
+        def validate(data, manager=None):
+            if required and name not in data:
+                raise exceptions.ValidationError(f"{name!r} is required.")
+        return validate
+
+    def in_bounds(self, values, manager):
+        return True
+
+    def column_validator(self):
+        """Return a function validating this field across a list of data mappings.
+
+        The function takes the mappings and a manager, as the validator does, and returns the index and
+        message of each failing row.  When every value present is of one of the field's ``kinds`` and in
+        bounds, the column passes without a row by row check.
+        """
+        name, required, kinds, in_bounds, validate = (
+            self.data_name, self.required, self.kinds, self.in_bounds, self.validator())
+
+        def validate_column(rows, manager=None):
+            if kinds is not None:
+                values = [data[name] for data in rows if name in data]
+                if (not required or len(values) == len(rows)) and set(map(type, values)) <= kinds \
+                        and in_bounds(values, manager):
+                    return []
+
+            errors = []
+            for index, data in enumerate(rows):
+                try:
+                    validate(data, manager)
+                except exceptions.ValidationError as e:
+                    errors.append((index, str(e)))
+            return errors
+        return validate_column
 
 
 class BooleanField(Field):
+    kinds = {bool}
+
     def __init__(self):
         super().__init__()
 
-    def validate(self, data):
-        super().validate(data)
-        value = data[self.data_name]
-        if not isinstance(value, bool):
-            raise exceptions.ValidationError(f"{self.data_name!r} must be a boolean.")
+    def validator(self):
+        name = self.data_name
+
+        def validate(data, manager=None):
+            if name not in data:
+                raise exceptions.ValidationError(f"{name!r} is required.")
+            if not isinstance(data[name], bool):
+                raise exceptions.ValidationError(f"{name!r} must be a boolean.")
+        return validate
 
 
 class IntField(Field):
+    kinds = {int}
+
     def __init__(self, min=None, max=None, **kwargs):
         super().__init__(**kwargs)
         self.min = min
         self.max = max
 
-    def validate(self, data):
-        super().validate(data)
-        if self.data_name not in data:
-            return
-        value = data[self.data_name]
-        if not isinstance(value, int):
-            raise exceptions.ValidationError(f"{self.data_name!r} must be an integer.")
-        if self.min is not None and value < self.min:
-            raise exceptions.ValidationError(f"{self.data_name!r} must be greater than or equal to {self.min}.")
-        if self.max is not None and value > self.max:
-            raise exceptions.ValidationError(f"{self.data_name!r} must be less than or equal to {self.max}.")
+    def in_bounds(self, values, manager):
+        if not values:
+            return True
+        return (self.min is None or min(values) >= self.min) and (self.max is None or max(values) <= self.max)
+
+    def validator(self):
+        name, required, _min, _max = self.data_name, self.required, self.min, self.max
+
+        def validate(data, manager=None):
+            if name not in data:
+                if required:
+                    raise exceptions.ValidationError(f"{name!r} is required.")
+                return
+            value = data[name]
+            if not isinstance(value, int):
+                raise exceptions.ValidationError(f"{name!r} must be an integer.")
+            if _min is not None and value < _min:
+                raise exceptions.ValidationError(f"{name!r} must be greater than or equal to {_min}.")
+            if _max is not None and value > _max:
+                raise exceptions.ValidationError(f"{name!r} must be less than or equal to {_max}.")
+        return validate
 
 
 class CharField(Field):
-    def validate(self, data):
-        super().validate(data)
-        if self.data_name not in data:
-            return
-        value = data[self.data_name]
-        if not isinstance(value, str):
-            raise exceptions.ValidationError(f"{self.data_name!r} must be a string.")
+    kinds = {str}
+
+    def validator(self):
+        name, required = self.data_name, self.required
+
+        def validate(data, manager=None):
+            if name not in data:
+                if required:
+                    raise exceptions.ValidationError(f"{name!r} is required.")
+                return
+            if not isinstance(data[name], str):
+                raise exceptions.ValidationError(f"{name!r} must be a string.")
+        return validate
 
 
 class PrimaryKey(Field):
+    kinds = {int}
+
     def __init__(self):
         super().__init__()
 
-    def validate(self, data):
-        super().validate(data)
-        value = data[self.name]
-        if not isinstance(value, int):
-            raise exceptions.ValidationError(f"{self.name!r} must be an integer.")
+    def validator(self):
+        name = self.name
+
+        def validate(data, manager=None):
+            if name not in data:
+                raise exceptions.ValidationError(f"{name!r} is required.")
+            if not isinstance(data[name], int):
+                raise exceptions.ValidationError(f"{name!r} must be an integer.")
+        return validate
 
 
 class Reference(Field):
+    kinds = {int}
+
     def __init__(self, types=None, **kwargs):
         super().__init__(**kwargs)
         self.types = types
@@ -85,33 +165,50 @@ class Reference(Field):
     def data_name(self):
         return f'{self.name}_id'
 
-    def from_data(self, data):
-        value = data.get(self.data_name)
+    def to_python(self, value):
         if value is None:
             return None
-
-        from .engine import Entity
-        return Entity.manager.get_entity('metadata', value)
+        return engine.Entity.manager.get_entity('metadata', value)
 
     def to_data(self, value):
-        from .engine import Entity
-        if isinstance(value, Entity):
+        if isinstance(value, engine.Entity):
             return value.pk
         if value is None:
             raise exceptions.empty
         return value
 
-    def validate(self, data):
-        super().validate(data)
-        if self.data_name not in data:
-            return
-        value = data[self.data_name]
-        if not isinstance(value, int):
-            raise exceptions.ValidationError(f"{self.data_name!r} must be an integer.")
-
-        from .engine import Entity
-        entity = Entity.manager.get_entity('metadata', value)
-        if entity is None:
-            raise exceptions.ValidationError(f"{self.data_name!r} is not an existing entity.")
-        if self.types is not None and entity.type not in self.types:
-            raise exceptions.ValidationError(f"{self.data_name!r} cannot point to an entity of this type.")
+    def in_bounds(self, values, manager):
+        # Every value has to point to an existing entity of one of the allowed types.
+        if manager is None:
+            manager = engine.Entity.manager
+        if self.types is None:
+            return manager.get_entities('metadata').keys() >= set(values)
+        values = set(values)
+        for _type in self.types:
+            values -= manager.get_pks(_type)
+        return not values
+
+    def validator(self):
+        name, required, types = self.data_name, self.required, self.types
+
+        def validate(data, manager=None):
+            if name not in data:
+                if required:
+                    raise exceptions.ValidationError(f"{name!r} is required.")
+                return
+            value = data[name]
+            if not isinstance(value, int):
+                raise exceptions.ValidationError(f"{name!r} must be an integer.")
+
+            if manager is None:
+                manager = engine.Entity.manager
+            entity = manager.get_entity('metadata', value)
+            if entity is None:
+                raise exceptions.ValidationError(f"{name!r} is not an existing entity.")
+            if types is not None and entity.type not in types:
+                raise exceptions.ValidationError(f"{name!r} cannot point to an entity of this type.")
+        return validate
+
+
+# Imported last, as the engine in turn imports the components that are declared with these fields.
+from . import engine  # noqa: E402
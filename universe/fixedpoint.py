@@ -0,0 +1,52 @@
+"""Exact integer arithmetic for the turn systems.
+
+Quantities are integers scaled by a power of ten, e.g. coordinates in units of 1/SCALE light-years,
+and every division rounds half-to-even, as Decimal does by default, so that a turn comes out the
+same on every machine.
+"""
+import math
+
+
+SCALE = 10 ** 12
+
+
+def _isqrt(n):
+    # Newton's method, for interpreters lacking math.isqrt.
+    if n < 0:
+        raise ValueError("isqrt() argument must be nonnegative")
+    if n == 0:
+        return 0
+    x = 1 << ((n.bit_length() + 1) // 2)
+    while True:
+        y = (x + n // x) // 2
+        if y >= x:
+            return x
+        x = y
+
+
+isqrt = getattr(math, 'isqrt', _isqrt)
+
+
+def divide(a, b):
+    """Divide two integers, rounding the quotient half-to-even."""
+    if b < 0:
+        a, b = -a, -b
+    q, r = divmod(a, b)
+    if 2 * r > b or (2 * r == b and q % 2):
+        q += 1
+    return q
+
+
+def to_fixed(value, scale=SCALE):
+    """Scale an integer up to fixed point."""
+    return value * scale
+
+
+def to_int(value, scale=SCALE):
+    """Round a fixed point value to the nearest integer, half-to-even."""
+    return divide(value, scale)
+
+
+def round_fixed(value, scale=SCALE):
+    """Round a fixed point value to the nearest whole unit, keeping it scaled."""
+    return divide(value, scale) * scale
@@ -0,0 +1,51 @@
+"""Reverse indexes over the Reference fields of entities.
+
+The Manager keeps a References for the data name of every Reference field of its entity types, e.g.
+'owner_id', and updates it as entities are registered, unregistered, and have the field written.
+"""
+
+
+class References:
+    """The entities referring to each pk through one data name, e.g. everything owned by a species.
+
+    Only the referrers of each pk are stored.  The pk an entity refers to is read off of the entity,
+    so the manager takes an entity out of the index before the field is written and puts it back
+    after.  Values that are not integers, e.g. None or those yet to be validated, are not indexed.
+    """
+
+    def __init__(self, data_name):
+        self.data_name = data_name
+        self.referrers = {}
+
+    def __len__(self):
+        return sum(map(len, self.referrers.values()))
+
+    def __contains__(self, entity):
+        return entity in self.referrers.get(getattr(entity, self.data_name), ())
+
+    def add(self, entity):
+        self.extend([entity], [getattr(entity, self.data_name)])
+
+    def extend(self, entities, pks):
+        """Add entities whose pks are already at hand, e.g. gathered from their column."""
+        referrers = self.referrers
+        for entity, pk in zip(entities, pks):
+            if type(pk) is int:
+                referrers.setdefault(pk, {})[entity] = None
+
+    def discard(self, entity):
+        """Take an entity out of the referrers of the pk it currently refers to, if it is there."""
+        pk = getattr(entity, self.data_name)
+        referrers = self.referrers.get(pk) if type(pk) is int else None
+        if referrers is not None:
+            referrers.pop(entity, None)
+            if not referrers:
+                del self.referrers[pk]
+
+    def get(self, pk):
+        """The entities referring to pk, in the order they came to refer to it."""
+        return list(self.referrers.get(pk, ()))
+
+    def items(self):
+        """Each pk referred to, with its referrers, in the order the pks were first referred to."""
+        return ((pk, list(referrers)) for pk, referrers in self.referrers.items())
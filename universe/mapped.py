@@ -0,0 +1,201 @@
+"""Save files laying out the manager's component tables as they are held in columnar storage.
+
+Every packed column is written as a contiguous little-endian array, alongside the byte per row that
+records whether a value is present.  Reading a file maps it into memory copy-on-write, and a
+columnar manager adopts those arrays directly as its columns, so that e.g. planet environments are
+only turned into Python objects when something actually reads them, and the file itself is never
+modified.  Columns of Python objects, such as primary keys and names, are kept in the JSON header.
+
+The file is laid out as::
+
+    magic, header size       8 bytes each
+    header                   JSON: the state's headers, the row count, and each table's columns
+    arrays                   each aligned to 8 bytes
+"""
+import json
+import mmap
+import struct
+import sys
+from array import array
+from itertools import compress
+
+from . import columns, exceptions
+
+
+MAGIC = b'UNVMAP01'
+ALIGNMENT = 8
+
+
+def _little_endian(values):
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+
+def write_state(fp, state, manager):
+    """Write the headers of a state, e.g. turn and width, and the manager's tables to a binary file.
+
+    The manager has to use columnar storage.  Rows of unregistered entities are left out.
+    """
+    if manager.storage != 'columnar':
+        raise ValueError("Only a manager with columnar storage can be written to a mapped save.")
+    # Loading a mapped save skips validation, so that its columns need not be read in just to check them.
+    errors = manager.validate_entities()
+    if errors:
+        raise exceptions.ValidationErrors(errors)
+
+    # Tables only grow as entities with their component are added, so bring them all to the same length.
+    for table in manager._tables.values():
+        table.extend(len(manager._rows))
+    metadata = manager._tables['metadata']
+    rows = metadata.rows()
+    contiguous = rows == list(range(len(rows)))
+
+    def gather(values):
+        return values[:len(rows)] if contiguous else [values[row] for row in rows]
+
+    blobs, offset = [], 0
+
+    def blob(data):
+        nonlocal offset
+        data = bytes(data)
+        start = offset
+        blobs.append(data + bytes(-len(data) % ALIGNMENT))
+        offset += len(blobs[-1])
+        return start
+
+    tables = {}
+    for name, table in manager._tables.items():
+        spec = {'live': blob(gather(table.live)), 'columns': {}}
+        for data_name, column in table.columns.items():
+            column_spec = spec['columns'][data_name] = {'state': blob(gather(column.state))}
+            if isinstance(column, columns.TypedColumn):
+                column_spec['typecode'] = column.typecode
+                column_spec['values'] = blob(_little_endian(array(column.typecode, gather(column.values))))
+                column_spec['objects'] = [
+                    [index, column.objects[row]] for index, row in enumerate(rows) if row in column.objects]
+            else:
+                column_spec['values'] = gather(column.values)
+        tables[name] = spec
+
+    headers = {key: value for key, value in state.items() if key != 'entities'}
+    headers['seq'] = manager._seq
+    header = json.dumps({'headers': headers, 'rows': len(rows), 'tables': tables}).encode('utf-8')
+    header += b' ' * (-len(header) % ALIGNMENT)
+
+    fp.write(MAGIC + struct.pack('<Q', len(header)) + header)
+    for data in blobs:
+        fp.write(data)
+
+
+class MappedEntities:
+    """The entities of a mapped save.
+
+    A columnar manager importing these adopts the file's tables as its own.  Any other manager
+    iterates over them, and registers each entity as it would one read from JSON.
+    """
+
+    def __init__(self, buffer, header, start):
+        self.buffer = buffer
+        self.rows = header['rows']
+        self.tables = header['tables']
+        self.start = start
+
+    def _view(self, offset, typecode='B'):
+        itemsize = array(typecode).itemsize
+        view = self.buffer[self.start + offset:self.start + offset + self.rows * itemsize]
+        if sys.byteorder != 'little' and itemsize > 1:
+            values = array(typecode)
+            values.frombytes(view)
+            values.byteswap()
+            return values
+        return view.cast(typecode)
+
+    def _load(self, table, spec):
+        # Point each of the table's columns at the file, in place, as the entity classes' descriptors hold them.
+        table.live = self._view(spec['live'])
+        for data_name, column in table.columns.items():
+            column_spec = spec['columns'][data_name]
+            column.state = self._view(column_spec['state'])
+            if isinstance(column, columns.TypedColumn):
+                column.values = self._view(column_spec['values'], column.typecode)
+                column.objects = dict(column_spec['objects'])
+            else:
+                column.values = column_spec['values']
+
+    def attach(self, manager):
+        """Adopt the file's tables as the columnar manager's own, and register a view for each row."""
+        if manager._rows:
+            raise ValueError("A mapped save can only be loaded into an empty manager.")
+        for name, spec in self.tables.items():
+            if name in manager._tables:
+                self._load(manager._tables[name], spec)
+        for table in manager._tables.values():
+            table.extend(self.rows)
+
+        metadata = manager._tables['metadata'].columns
+        pks, types = metadata['pk'].values, metadata['type'].values
+        classes = {_type: manager.get_entity_class(_type) for _type in set(types)}
+        entities = [object.__new__(classes[_type]) for _type in types]
+        for row, entity in enumerate(entities):
+            entity._row = row
+        manager._rows.extend(entities)
+
+        # Register the views a component at a time, by the rows the file marks as live in its table.
+        for name, table in manager._tables.items():
+            manager._components[name] = dict(zip(compress(pks, table.live), compress(entities, table.live)))
+        for _type in classes:
+            manager._types[_type] = {pk for pk, pk_type in zip(pks, types) if pk_type == _type}
+        positioned, (X, Y) = manager.get_columns('position', ['x', 'y'])
+        manager.spatial.extend(positioned, X, Y)
+        manager.locations.extend(positioned, X, Y)
+        for name, table in manager._tables.items():
+            for data_name, index in manager._references.items():
+                if data_name in table.columns:
+                    referrers, (pks,) = manager.get_columns(name, [data_name])
+                    index.extend(referrers, pks)
+
+    def __iter__(self):
+        # Decode each row into the dict that a JSON save would have held for it.
+        tables = []
+        for spec in self.tables.values():
+            fields = []
+            for data_name, column_spec in spec['columns'].items():
+                values, objects = column_spec['values'], {}
+                if 'typecode' in column_spec:
+                    values = self._view(values, column_spec['typecode'])
+                    if column_spec['typecode'] == columns.BooleanColumn.typecode:
+                        values = [bool(value) for value in values]
+                    objects = dict(column_spec['objects'])
+                fields.append((data_name, values, self._view(column_spec['state']), objects))
+            tables.append((self._view(spec['live']), fields))
+
+        for row in range(self.rows):
+            entity = {}
+            for live, fields in tables:
+                if not live[row]:
+                    continue
+                for data_name, values, state, objects in fields:
+                    if state[row] == columns.PRESENT:
+                        entity.setdefault(data_name, values[row])
+                    elif state[row] == columns.OBJECT:
+                        entity.setdefault(data_name, objects[row])
+            yield entity
+
+
+def read_state(fp):
+    """Map a save written by write_state into memory, and return its state.
+
+    The state's 'entities' is a MappedEntities, for GameState to import.
+    """
+    buffer = memoryview(mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_COPY))
+    if bytes(buffer[:len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a mapped game state.")
+    (size,) = struct.unpack('<Q', buffer[len(MAGIC):len(MAGIC) + 8])
+    start = len(MAGIC) + 8
+    header = json.loads(bytes(buffer[start:start + size]).decode('utf-8'))
+
+    state = header['headers']
+    state['entities'] = MappedEntities(buffer, header, start + size)
+    return state
@@ -0,0 +1,209 @@
+"""Spatial indexes over the positions of entities.
+
+The Manager keeps a Grid of every registered entity with a position component, and moves entities
+between its cells as their x and y are written.  Its Locations is maintained alongside, and answers
+which entities are at an exact pair of coordinates.
+"""
+import heapq
+
+
+class Grid:
+    """A uniform grid of square cells, each holding a list of the entities positioned within it.
+
+    Only which cell an entity is in is stored.  Coordinates are read off of the entities themselves,
+    both to answer queries and to find an entity's cell, so the manager takes an entity out of the
+    grid before its x or y is written and puts it back after.  Entities whose coordinates are not
+    both integers, e.g. those yet to be validated, are left out until they are given valid ones.
+    """
+    # The number of cells across the width of a universe, and the size of a cell when it is unknown.
+    CELLS = 64
+    SIZE = 16
+
+    def __init__(self, size=SIZE):
+        self.size = size
+        self.cells = {}
+
+    @classmethod
+    def for_width(cls, width):
+        if not width:
+            return cls()
+        return cls(max(1, width // cls.CELLS))
+
+    def __len__(self):
+        return sum(map(len, self.cells.values()))
+
+    def __contains__(self, entity):
+        return any(member is entity for member in self.cells.get(self._key(entity.x, entity.y), ()))
+
+    def _key(self, x, y):
+        if type(x) is not int or type(y) is not int:
+            return None
+        return x // self.size, y // self.size
+
+    def add(self, entity):
+        self.extend([entity], [entity.x], [entity.y])
+
+    def extend(self, entities, X, Y):
+        """Add entities whose coordinates are already at hand, e.g. gathered from their columns."""
+        cells = self.cells
+        for entity, x, y in zip(entities, X, Y):
+            key = self._key(x, y)
+            if key is not None:
+                cells.setdefault(key, []).append(entity)
+
+    def discard(self, entity):
+        """Take an entity out of the cell its current coordinates are in, if it is there."""
+        key = self._key(entity.x, entity.y)
+        cell = self.cells.get(key)
+        if cell is None:
+            return
+        for index, member in enumerate(cell):
+            if member is entity:
+                del cell[index]
+                if not cell:
+                    del self.cells[key]
+                return
+
+    def _scan(self, x0, y0, x1, y1):
+        # The (entity, x, y) of everything in the cells overlapping a rectangle, whose bounds need not be
+        # integers.
+        size, cells = self.size, self.cells
+        columns = range(int(x0 // size), int(x1 // size) + 1)
+        rows = range(int(y0 // size), int(y1 // size) + 1)
+        if len(columns) * len(rows) > len(cells):
+            keys = [key for key in cells if key[0] in columns and key[1] in rows]
+        else:
+            keys = [(i, j) for i in columns for j in rows if (i, j) in cells]
+        for key in keys:
+            for entity in cells[key]:
+                yield entity, entity.x, entity.y
+
+    def rectangle(self, x0, y0, x1, y1):
+        """The entities with x0 <= x <= x1 and y0 <= y <= y1, in no particular order."""
+        return [entity for entity, x, y in self._scan(x0, y0, x1, y1) if x0 <= x <= x1 and y0 <= y <= y1]
+
+    def within(self, x, y, radius):
+        """The entities at most radius light-years from (x, y), in no particular order."""
+        limit = radius * radius
+        return [
+            entity for entity, x_e, y_e in self._scan(x - radius, y - radius, x + radius, y + radius)
+            if (x_e - x) * (x_e - x) + (y_e - y) * (y_e - y) <= limit
+        ]
+
+    def nearest(self, x, y, count=1):
+        """The count entities closest to (x, y), nearest first and then by pk.
+
+        Cells are searched in rings outward from the one holding (x, y), until no entity further out
+        could be closer than those already found.
+        """
+        if count <= 0:
+            return []
+
+        def distances(entities):
+            return [
+                ((entity.x - x) * (entity.x - x) + (entity.y - y) * (entity.y - y), entity.pk, entity)
+                for entity in entities
+            ]
+
+        size, cells = self.size, self.cells
+        i, j = int(x // size), int(y // size)
+        found, ring = [], 0
+        while True:
+            # Once a ring holds more cells than are occupied, comparing against everything is cheaper.
+            if 8 * ring > len(cells):
+                found = heapq.nsmallest(count, distances(entity for cell in cells.values() for entity in cell))
+                break
+            if ring == 0:
+                keys = [(i, j)]
+            else:
+                keys = [(i + d, j - ring) for d in range(-ring, ring + 1)]
+                keys += [(i + d, j + ring) for d in range(-ring, ring + 1)]
+                keys += [(i - ring, j + d) for d in range(1 - ring, ring)]
+                keys += [(i + ring, j + d) for d in range(1 - ring, ring)]
+            found = heapq.nsmallest(count, found + distances(
+                entity for key in keys if key in cells for entity in cells[key]))
+            # Anything outside the rings searched so far is at least this far from (x, y), and could still
+            # be tied with the furthest found so far while having a lower pk.
+            bound = min(x - (i - ring) * size + 1, (i + ring + 1) * size - x,
+                        y - (j - ring) * size + 1, (j + ring + 1) * size - y)
+            if len(found) == count and found[-1][0] < bound * bound:
+                break
+            ring += 1
+        return [entity for _distance, _pk, entity in found]
+
+
+class Locations:
+    """The entities at each exact pair of coordinates.
+
+    Each occupied point maps to its one entity, or to a list of them once it is shared, so that looking
+    up a point takes a single dict lookup.  Points are keyed by complex(x, y), which takes half the
+    memory of a tuple.  As with the Grid, coordinates are read off of the entities, so the manager takes
+    an entity out before its x or y is written and puts it back after, and entities whose coordinates
+    are not both integers are left out.
+    """
+
+    def __init__(self):
+        self.points = {}
+
+    def __len__(self):
+        return sum(len(entities) if type(entities) is list else 1 for entities in self.points.values())
+
+    def __contains__(self, entity):
+        entities = self.points.get(self._key(entity.x, entity.y))
+        return entities is entity or type(entities) is list and any(member is entity for member in entities)
+
+    def _key(self, x, y):
+        if type(x) is not int or type(y) is not int:
+            return None
+        return complex(x, y)
+
+    def add(self, entity):
+        self.extend([entity], [entity.x], [entity.y])
+
+    def extend(self, entities, X, Y):
+        """Add entities whose coordinates are already at hand, e.g. gathered from their columns."""
+        points = self.points
+        for entity, x, y in zip(entities, X, Y):
+            key = self._key(x, y)
+            if key is None:
+                continue
+            other = points.get(key)
+            if other is None:
+                points[key] = entity
+            elif type(other) is list:
+                other.append(entity)
+            else:
+                points[key] = [other, entity]
+
+    def discard(self, entity):
+        """Take an entity out of the point at its current coordinates, if it is there."""
+        key = self._key(entity.x, entity.y)
+        entities = self.points.get(key)
+        if entities is entity:
+            del self.points[key]
+        elif type(entities) is list:
+            for index, member in enumerate(entities):
+                if member is entity:
+                    del entities[index]
+                    if len(entities) == 1:
+                        self.points[key] = entities[0]
+                    return
+
+    def at(self, x, y):
+        """The entities at (x, y), by pk."""
+        entities = self.points.get(complex(x, y))
+        if entities is None:
+            return []
+        if type(entities) is not list:
+            return [entities]
+        return sorted(entities, key=lambda entity: entity.pk)
+
+    def groups(self):
+        """The entities at each of the coordinates shared by more than one entity, by pk.
+
+        The groups are in no particular order.
+        """
+        return [
+            sorted(entities, key=lambda entity: entity.pk)
+            for entities in self.points.values() if type(entities) is list
+        ]
@@ -0,0 +1,136 @@
+import json
+
+
+class _Reader:
+    """Incrementally decodes JSON values out of a text file, reading it a chunk at a time."""
+
+    WHITESPACE = ' \t\n\r'
+
+    def __init__(self, fp, chunk_size=1 << 16):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+        # The decoder only shares equal keys between the objects of a single value, so do it across values.
+        keys = {}
+        self.decoder = json.JSONDecoder(
+            object_pairs_hook=lambda pairs: {keys.setdefault(key, key): value for key, value in pairs})
+
+    def _fill(self, size):
+        data = self.fp.read(size)
+        if not data:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.position:] + data
+        self.position = 0
+        return True
+
+    def peek(self):
+        """Skip whitespace, and return the next character without consuming it, or '' at the end of the file."""
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in self.WHITESPACE:
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._fill(self.chunk_size):
+                return ''
+
+    def take(self, expected):
+        char = self.peek()
+        if not char:
+            raise ValueError(f"Expected one of {expected!r} at offset {self.position}, got the end of the file.")
+        if char not in expected:
+            raise ValueError(f"Expected one of {expected!r} at offset {self.position}, got {char!r}.")
+        self.position += 1
+        return char
+
+    def value(self):
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if self.eof or not self._fill(size):
+                    raise
+            else:
+                # A number running up to the end of the buffer might continue in the next chunk.
+                if end < len(self.buffer) or self.eof or not self._fill(size):
+                    self.position = end
+                    return value
+            # Read ever larger chunks, so that a single huge value is not decoded over and over.
+            size *= 2
+
+
+def _array(reader, state):
+    # Yield the elements of the entities array, then read the rest of the document into the state.
+    reader.take('[')
+    if reader.peek() == ']':
+        reader.take(']')
+    else:
+        while True:
+            yield reader.value()
+            if reader.take(',]') == ']':
+                break
+
+    while reader.take(',}') == ',':
+        key = reader.value()
+        reader.take(':')
+        state[key] = reader.value()
+
+
+def _lines(reader):
+    while reader.peek():
+        yield reader.value()
+
+
+def read_state(fp, chunk_size=1 << 16):
+    """Read a game state from a text file, without parsing its entities up front.
+
+    Either a JSON document in the format GameState takes, or JSON lines with the state's headers on the
+    first line and an entity on each of the following, is accepted.  The returned state's 'entities'
+    is an iterator decoding entities as it goes, so that GameState can register each one as it is read.
+    In a JSON document, any keys following 'entities' are added to the state once it is exhausted.
+    """
+    reader, state = _Reader(fp, chunk_size), {}
+    reader.take('{')
+    if reader.peek() != '}':
+        while True:
+            key = reader.value()
+            reader.take(':')
+            if key == 'entities':
+                state['entities'] = _array(reader, state)
+                return state
+            state[key] = reader.value()
+            if reader.take(',}') == '}':
+                break
+    else:
+        reader.take('}')
+
+    state['entities'] = _lines(reader)
+    return state
+
+
+def write_state(fp, state, lines=False):
+    """Write a game state to a text file, serializing its entities one at a time.
+
+    'entities' may be any iterable, such as Manager.export_entities(), and is written after the other
+    keys.  The output is then the same JSON document json.dump would produce, or, with ``lines``, JSON
+    lines as read by read_state.
+    """
+    headers = {key: value for key, value in state.items() if key != 'entities'}
+    entities = state.get('entities', ())
+    if lines:
+        fp.write(json.dumps(headers) + '\n')
+        for entity in entities:
+            fp.write(json.dumps(entity) + '\n')
+        return
+
+    fp.write('{')
+    for key, value in headers.items():
+        fp.write(f'{json.dumps(key)}: {json.dumps(value)}, ')
+    fp.write('"entities": [')
+    for index, entity in enumerate(entities):
+        fp.write(', ' + json.dumps(entity) if index else json.dumps(entity))
+    fp.write(']}')
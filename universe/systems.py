@@ -1,125 +1,305 @@
 from collections import defaultdict
-from decimal import Decimal
+from itertools import chain
 
-from . import utils
+from . import fixedpoint, utils
+
+
+def _chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
 
 
 class UpdateSystem:
     def process(self, manager):
-        queues = defaultdict(dict)
-        for order in manager.get_entities('orders').values():
-            queues[order.actor_id][order.seq] = order
+        # The orders of each actor by seq, looked up in the manager's index as each actor comes up.
+        queues = {}
+
+        def queue(actor_id):
+            if actor_id not in queues:
+                queues[actor_id] = {
+                    order.seq: order for order in manager.get_referrers('actor_id', actor_id) if 'orders' in order
+                }
+            return queues[actor_id]
 
         for data in manager._updates:
             action = data.pop('action')
             if action == 'create':
-                if data['actor_id'] in queues and data['seq'] in queues[data['actor_id']]:
+                if data['seq'] in queue(data['actor_id']):
                     continue
                 order = manager.register_entity(data)
-                queues[order.actor_id][order.seq] = order
+                queue(order.actor_id)[order.seq] = order
             elif action == 'reorder':
-                if data['actor_id'] not in queues:
-                    continue
-                if data['seq1'] not in queues[data['actor_id']]:
+                orders = queue(data['actor_id'])
+                if data['seq1'] not in orders:
                     continue
-                if data['seq2'] not in queues[data['actor_id']]:
+                if data['seq2'] not in orders:
                     continue
-                order1 = queues[data['actor_id']].pop(data['seq1'], None)
-                order2 = queues[data['actor_id']].pop(data['seq2'], None)
+                order1 = orders.pop(data['seq1'], None)
+                order2 = orders.pop(data['seq2'], None)
                 order1.seq, order2.seq = order2.seq, order1.seq
-                queues[order1.actor_id][order1.seq] = order1
-                queues[order2.actor_id][order2.seq] = order2
+                queue(order1.actor_id)[order1.seq] = order1
+                queue(order2.actor_id)[order2.seq] = order2
             elif action == 'update':
-                if data['actor_id'] not in queues:
+                orders = queue(data['actor_id'])
+                if data['seq'] not in orders:
                     continue
-                if data['seq'] not in queues[data['actor_id']]:
-                    continue
-                order = queues[data['actor_id']][data['seq']]
+                order = orders[data['seq']]
                 for k, v in data.items():
                     setattr(order, k, v)
             elif action == 'delete':
-                if data['actor_id'] not in queues:
-                    continue
-                if data['seq'] not in queues[data['actor_id']]:
+                orders = queue(data['actor_id'])
+                if data['seq'] not in orders:
                     continue
-                manager.unregister_entity(queues[data['actor_id']][data['seq']])
-                del queues[data['actor_id']][data['seq']]
+                manager.unregister_entity(orders[data['seq']])
+                del orders[data['seq']]
 
 
 class MovementSystem:
+    """Moves every ship along the first of its movement orders.
+
+    A ship covers warp**2 light-years per turn, however finely the turn is simulated.  ``steps`` sets
+    the number of substeps the turn is divided into, defaulting to the reference resolution of N.
+    With ``adaptive`` set, objects that have to be simulated advance ``stride`` substeps at a time
+    while all of them are farther than REFINE strides' worth of travel from their goals, and single
+    substeps otherwise.  Only the defaults reproduce the reference results exactly; coarser or
+    adaptive stepping agrees with them to within TOLERANCE light-years on each coordinate for the
+    end positions of pursuing objects, while objects with straight-line paths are unaffected.
+
+    Configure the system a game uses through GameState.SYSTEMS.
+    """
     N = 1000
+    STRIDE = 10
+    REFINE = 4
+    TOLERANCE = 1
 
-    def _vector_to_target(self, move):
-        speed = Decimal(move.warp ** 2) / self.N
+    # Positions and velocities are integers in units of 1/SCALE light-years, so that a turn is
+    # computed with exact, reproducible arithmetic.
+    SCALE = fixedpoint.SCALE
 
-        if move.target is not None:
-            x_t, y_t = move.target.x, move.target.y
-        else:
-            x_t, y_t = move.x_t, move.y_t
+    def __init__(self, steps=N, adaptive=False, stride=STRIDE):
+        self.steps = steps
+        self.stride = stride if adaptive else 1
 
-        # Aim for the midpoint of the 1-light-year sector the goal is in.
-        dx, dy = Decimal(x_t).to_integral_value() - move.actor.x, Decimal(y_t).to_integral_value() - move.actor.y
+    def _round(self, value):
+        # Round a scaled value to the nearest whole light-year, keeping it scaled.
+        return fixedpoint.round_fixed(value, self.SCALE)
 
-        D = Decimal(dx ** 2 + dy ** 2).sqrt()
-        if D.to_integral_value() <= speed:
-            move.actor.dx, move.actor.dy = dx, dy
-        else:
-            move.actor.dx, move.actor.dy = speed * dx / D, speed * dy / D
-
-        # The naive prediction of the endpoint for this object
-        remaining = self.N - self.step
-        x_p = (move.actor.x + remaining * move.actor.dx).to_integral_value()
-        y_p = (move.actor.y + remaining * move.actor.dy).to_integral_value()
-        if not hasattr(move.actor, 'x_p'):
-            move.actor.x_p, move.actor.y_p = x_p, y_p
-        # If the projected endpoint is not stable, intercepting objects should just use Euler.
-        if (move.actor.x_p, move.actor.y_p) != (x_p, y_p):
-            move.actor.x_p, move.actor.y_p = None, None
-
-    def _vector_to_projection(self, move):
-        # Update the real vector of this object based on the (non-updated) observable vector of its target.
-        if move.target is None:
-            return
-
-        # Only proceed with moving towards the target's projected endpoint if it is stable.
-        if getattr(move.target, 'x_p', None) is None:
-            return
-
-        x_p, y_p = move.target.x_p, move.target.y_p
-        dx, dy = x_p - move.actor.x, y_p - move.actor.y
-
-        speed = Decimal(move.warp ** 2) / self.N
-        D = Decimal(dx ** 2 + dy ** 2).sqrt()
-        if D.to_integral_value() <= speed:
-            move.actor.dx, move.actor.dy = dx, dy
+    def _vector(self, speed, x, y, x_t, y_t):
+        # The velocity of an object heading straight for its goal, clamped to its speed.
+        dx, dy = x_t - x, y_t - y
+        D = fixedpoint.isqrt(dx * dx + dy * dy)
+        if self._round(D) <= speed:
+            return dx, dy
+        return fixedpoint.divide(speed * dx, D), fixedpoint.divide(speed * dy, D)
+
+    def _stride(self, X, Y, speed, targets, TX, TY):
+        # Take a full stride only if no object could come within reach of its goal during it.
+        if self.stride == 1:
+            return 1
+        for x, y, s, t, x_t, y_t in zip(X, Y, speed, targets, TX, TY):
+            if t is not None:
+                x_t, y_t, s = X[t], Y[t], s + speed[t]
+            if max(abs(x_t - x), abs(y_t - y)) <= self.REFINE * self.stride * s + self.SCALE:
+                return 1
+        return self.stride
+
+    def _simulate(self, X, Y, speed, targets, TX, TY):
+        """Advance all moving objects together through every substep of a turn.
+
+        X, Y and speed are the scaled starting positions and per-substep speeds of the objects.
+        Each object either pursues another moving object, given by its index in ``targets``, or heads
+        for the fixed scaled coordinates in TX, TY.  Returns the scaled end positions.
+        """
+        X, Y, TX, TY = list(X), list(Y), list(TX), list(TY)
+        if not X:
+            return X, Y
+        pursuers = [(i, t) for i, t in enumerate(targets) if t is not None]
+        XP, YP = None, None
+
+        step = 0
+        while step < self.steps:
+            stride = min(self._stride(X, Y, speed, targets, TX, TY), self.steps - step)
+
+            # Aim for the midpoint of the 1-light-year sector the goal is currently in.
+            for i, t in pursuers:
+                TX[i], TY[i] = self._round(X[t]), self._round(Y[t])
+            reach = [s * stride for s in speed]
+            VX, VY = map(list, zip(*map(self._vector, reach, X, Y, TX, TY)))
+
+            # The naive prediction of the endpoint for each object.  If it is not stable,
+            # intercepting objects should just use Euler.
+            remaining = self.steps - step
+            xp = [self._round(x + fixedpoint.divide(remaining * vx, stride)) for x, vx in zip(X, VX)]
+            yp = [self._round(y + fixedpoint.divide(remaining * vy, stride)) for y, vy in zip(Y, VY)]
+            if XP is None:
+                XP, YP = xp, yp
+            else:
+                XP = [p if p == q else None for p, q in zip(XP, xp)]
+                YP = [p if p == q else None for p, q in zip(YP, yp)]
+
+            # Update the real vector of each pursuer based on the stable projected endpoint of its target.
+            for i, t in pursuers:
+                if XP[t] is None or YP[t] is None:
+                    continue
+                VX[i], VY[i] = self._vector(reach[i], X[i], Y[i], XP[t], YP[t])
+
+            X = [x + vx for x, vx in zip(X, VX)]
+            Y = [y + vy for y, vy in zip(Y, VY)]
+            step += stride
+
+        return X, Y
+
+    def _closed_form(self, x, y, speed, x_t, y_t):
+        """The scaled end position of an object heading in a straight line for fixed coordinates.
+
+        This is the result of _simulate, short of the rounding error that the substeps accumulate,
+        so None is returned where that error could change which light-year the object ends up in.
+        """
+        S, margin = self.SCALE, 4 * self.steps
+        dx, dy = x_t - x, y_t - y
+        D = fixedpoint.isqrt(dx * dx + dy * dy)
+
+        # The object snaps onto its goal on the first substep that it is within reach of it, which
+        # it will have covered all but the last substep's worth of distance by.
+        rest = D - speed * (self.steps - 1)
+        boundary = speed // S * S + S // 2
+        if abs(rest - boundary) <= margin:
+            return None
+        if rest < boundary:
+            return x_t, y_t
+
+        travel = speed * self.steps
+        x_e, y_e = x + fixedpoint.divide(travel * dx, D), y + fixedpoint.divide(travel * dy, D)
+        if abs(x_e % S - S // 2) <= margin or abs(y_e % S - S // 2) <= margin:
+            return None
+        return x_e, y_e
+
+    def _schedule(self, targets):
+        """Order the pursuit graph given by ``targets`` so that every target comes before its pursuers.
+
+        Returns that order along with the set of objects caught up in a cycle of mutual pursuit.
+        """
+        state = [0] * len(targets)  # unvisited, on the current path, or finished
+        order, cyclic = [], set()
+        for start in range(len(targets)):
+            path, i = [], start
+            while i is not None and state[i] == 0:
+                state[i] = 1
+                path.append(i)
+                i = targets[i]
+            if i is not None and state[i] == 1:
+                cyclic.update(path[path.index(i):])
+            for i in reversed(path):
+                state[i] = 2
+                order.append(i)
+        return order, cyclic
+
+    def _groups(self, members, targets):
+        # Partition the objects into the connected components of the pursuit graph.
+        parent = {i: i for i in members}
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i in members:
+            if targets[i] is not None:
+                parent[find(i)] = find(targets[i])
+
+        groups = defaultdict(list)
+        for i in members:
+            groups[find(i)].append(i)
+        return list(groups.values())
+
+    def _solve(self, X, Y, speed, targets, TX, TY, executor=None):
+        """Find the scaled end positions of all moving objects, taking the same arguments as _simulate.
+
+        Objects are resolved in closed form, targets before pursuers, wherever their path is a straight
+        line: heading for fixed coordinates, or pursuing an object whose projected endpoint is stable
+        for the whole turn.  The remainder, e.g. cycles of mutual pursuit, along with the objects whose
+        trajectories they depend on, are simulated substep by substep one pursuit group at a time, which
+        are spread across the executor if one is given.
+        """
+        X, Y = list(X), list(Y)
+        order, cyclic = self._schedule(targets)
+
+        ends, stable = {}, {}
+        for i in order:
+            t = targets[i]
+            if i in cyclic:
+                continue
+            if t is None:
+                end = self._closed_form(X[i], Y[i], speed[i], TX[i], TY[i])
+                if end is not None and end != (TX[i], TY[i]):
+                    # Not arriving, this object projects onto the same endpoint on every substep.
+                    stable[i] = self._round(end[0]), self._round(end[1])
+            elif t in stable:
+                end = self._closed_form(X[i], Y[i], speed[i], *stable[t])
+            else:
+                continue
+            if end is not None:
+                ends[i] = end
+
+        # Simulating an object needs the whole trajectory of whatever it is pursuing.
+        stepwise = set()
+        for i in order:
+            while i is not None and i not in ends and i not in stepwise:
+                stepwise.add(i)
+                i = targets[i]
+                if i is not None:
+                    ends.pop(i, None)
+
+        for i, (x, y) in ends.items():
+            X[i], Y[i] = x, y
+
+        groups = self._groups(sorted(stepwise), targets)
+        arguments = []
+        for group in groups:
+            position = {i: k for k, i in enumerate(group)}
+            arguments.append((
+                [X[i] for i in group], [Y[i] for i in group], [speed[i] for i in group],
+                [position.get(targets[i]) for i in group], [TX[i] for i in group], [TY[i] for i in group]
+            ))
+        if executor is not None and len(groups) > 1:
+            results = executor.map(self._simulate, *zip(*arguments))
         else:
-            move.actor.dx, move.actor.dy = speed * dx / D, speed * dy / D
+            results = (self._simulate(*args) for args in arguments)
 
-    def process(self, manager):
-        movements = defaultdict(list)
-        for move in manager.get_entities('movement_orders').values():
-            movements[move.actor_id].append(move)
+        for group, (X_s, Y_s) in zip(groups, results):
+            for i, x, y in zip(group, X_s, Y_s):
+                X[i], Y[i] = x, y
+        return X, Y
 
-        movements = {_id: sorted(queue, key=lambda x: x.seq) for _id, queue in movements.items() if queue}
+    def process(self, manager):
+        movements = {}
+        for _id, orders in manager.get_references('actor_id').items():
+            queue = sorted((order for order in orders if 'movement_orders' in order), key=lambda x: x.seq)
+            if queue:
+                movements[_id] = queue
 
         for _id, entity in manager.get_entities('position').items():
             entity.x_prev, entity.y_prev = entity.x, entity.y
 
-        for self.step in range(self.N):
-            for queue in movements.values():
-                self._vector_to_target(queue[0])
-
-            for queue in movements.values():
-                self._vector_to_projection(queue[0])
+        moves = [queue[0] for queue in movements.values()]
+        index = {move.actor_id: i for i, move in enumerate(moves)}
+        X = [fixedpoint.to_fixed(move.actor.x, self.SCALE) for move in moves]
+        Y = [fixedpoint.to_fixed(move.actor.y, self.SCALE) for move in moves]
+        speed = [move.warp ** 2 * self.SCALE // self.steps for move in moves]
+        targets, TX, TY = [], [], []
+        for move in moves:
+            if move.target is not None:
+                targets.append(index.get(move.target_id))
+                TX.append(fixedpoint.to_fixed(move.target.x, self.SCALE))
+                TY.append(fixedpoint.to_fixed(move.target.y, self.SCALE))
+            else:
+                targets.append(None)
+                TX.append(fixedpoint.to_fixed(move.x_t, self.SCALE))
+                TY.append(fixedpoint.to_fixed(move.y_t, self.SCALE))
 
-            for queue in movements.values():
-                entity = queue[0].actor
-                dx, dy = entity.dx or Decimal(0), entity.dy or Decimal(0)
-                entity.x, entity.y = entity.x + dx, entity.y + dy
-
-        for queue in movements.values():
-            entity = queue[0].actor
-            entity.x, entity.y = int(entity.x.to_integral_value()), int(entity.y.to_integral_value())
+        X, Y = self._solve(X, Y, speed, targets, TX, TY, executor=manager.executor)
+        for move, x, y in zip(moves, X, Y):
+            move.actor.x, move.actor.y = fixedpoint.to_int(x, self.SCALE), fixedpoint.to_int(y, self.SCALE)
 
         # drop any waypoints that have been reached
         for queue in movements.values():
@@ -139,36 +319,76 @@ class MovementSystem:
 
 
 class PopulationGrowthSystem:
+    def _grow(self, population, growth_rate, habitability):
+        """The population of a planet after a year of growth.
+
+        ``growth_rate`` and ``habitability`` are whole percentages.  The result is computed as an
+        exact fraction of integers and rounded half-to-even once at the end.
+        """
+        divide = fixedpoint.divide
+        if habitability > 0:
+            capacity = 10_000 * habitability
+            if population > 4 * capacity:
+                # Overcrowded beyond 400% of capacity, the population dies off at a flat 12%.
+                return divide(population * (10_000 - 12 * habitability), 10_000)
+            if population > capacity:
+                # Over capacity, the death rate is 4% for each 100% of capacity exceeded.
+                return divide(population * (100_000_000 - 4 * (population - capacity)), 100_000_000)
+            if 4 * population > capacity:
+                # Above 25% of capacity, growth is slowed by a crowding factor of 16/9 * (1 - ratio)**2.
+                denominator = 90_000 * capacity ** 2
+                return divide(
+                    population * (denominator + 16 * growth_rate * habitability * (capacity - population) ** 2),
+                    denominator
+                )
+            return divide(population * (10_000 + growth_rate * habitability), 10_000)
+        if habitability < 0:
+            # For red planets, you always lose 1/10 of the negative hab rating,
+            # e.g. -45% is -4.5% per year.  See:
+            # https://starsautohost.org/sahforum2/index.php?t=msg&th=5565&rid=0#msg_62828
+            return divide(population * (1_000 + habitability), 1_000)
+        return population
+
+    # The number of planets shipped to a worker process at a time.
+    CHUNK = 5000
+
+    def _grow_planets(self, planets):
+        # Each planet is a (population, growth_rate, tolerances, environment) tuple of plain values.
+        return [
+            self._grow(population, growth_rate, utils.habitability_table(tolerances)(environment))
+            for population, growth_rate, tolerances, environment in planets
+        ]
+
     def process(self, manager):
-        for _id, entity in manager.get_entities('population').items():
-            if entity.type == 'ship':
+        # Gather the fields growth depends on a column at a time, and join planets to their environment by pk.
+        entities, (pks, owners, populations) = manager.get_columns('population', ['pk', 'owner_id', 'population'])
+        _, (environment_pks, *environments) = manager.get_columns('environment', ['pk', *utils.ENVIRONMENTS])
+        environments = dict(zip(environment_pks, zip(*environments)))
+
+        owned, planets, species = [], [], {}
+        for entity, pk, owner_id, population in zip(entities, pks, owners, populations):
+            environment = environments.get(pk)
+            if environment is None:  # ships carry population, but do not grow it
                 continue
-            species = manager.get_entity('species', entity.owner_id)
-            if species is None:
+            if owner_id not in species:
+                owner = manager.get_entity('species', owner_id)
+                species[owner_id] = (owner.growth_rate, utils.tolerances(owner)) if owner is not None else None
+            if species[owner_id] is None:
                 continue
 
-            population = entity.population or 0
-            growth_rate = Decimal(species.growth_rate) / 100
-            habitability = Decimal(utils.planet_value(species, entity)) / 100
-            capacity = 1_000_000 * habitability
-
-            crowding, ratio = 1, 1
-            if habitability >= 0:
-                ratio = population / capacity
-                if ratio > 4:
-                    growth_rate = Decimal('-0.12')
-                elif ratio > 1:
-                    growth_rate = Decimal('-0.04') * (ratio - 1)
-                elif ratio > 0.25:
-                    crowding = 16 * (1 - ratio) ** 2 / 9
-            else:
-                # For red planets, you always lose 1/10 of the negative hab rating,
-                # e.g. -45% is -4.5% per year.  See:
-                # https://starsautohost.org/sahforum2/index.php?t=msg&th=5565&rid=0#msg_62828
-                growth_rate = Decimal('0.10')
-
-            population *= 1 + growth_rate * habitability * crowding
-            entity.population = int(population.to_integral_value())
-            if entity.population <= 0:
-                del entity.population
+            growth_rate, tolerances = species[owner_id]
+            owned.append((entity, population))
+            planets.append((population or 0, growth_rate, tolerances, environment))
+
+        if manager.executor is not None and len(planets) > self.CHUNK:
+            populations = chain.from_iterable(manager.executor.map(self._grow_planets, _chunks(planets, self.CHUNK)))
+        else:
+            populations = self._grow_planets(planets)
+
+        for (entity, before), population in zip(owned, populations):
+            if population <= 0:
+                if before is not None:
+                    del entity.population
                 del entity.owner_id
+            elif population != before:
+                entity.population = population
@@ -1,17 +1,34 @@
+import functools
 import math
 
 
-def planet_value(species, planet):
+ENVIRONMENTS = ('gravity', 'temperature', 'radiation')
+
+
+def tolerances(species):
+    """The environmental tolerances of a species, as an (immune, min, max) triple per environment."""
+    return tuple(
+        (getattr(species, f'{env}_immune'), getattr(species, f'{env}_min'), getattr(species, f'{env}_max'))
+        for env in ENVIRONMENTS
+    )
+
+
+def environment(planet):
+    """The environment values of a planet, in the same order as the tolerances of a species."""
+    return tuple(getattr(planet, env) for env in ENVIRONMENTS)
+
+
+def environment_value(tolerances, environment):
     # Algorithm taken from https://starsautohost.org/sahforum2/index.php?t=rview&th=2299&rid=0
 
     value, red, ideal = 0, 0, 10000
-    for env in ('gravity', 'temperature', 'radiation'):
-        if getattr(species, f'{env}_immune'):
+    for (immune, _min, _max), env in zip(tolerances, environment):
+        if immune:
             value += 10000
         else:
-            radius = (getattr(species, f'{env}_max') - getattr(species, f'{env}_min')) // 2
-            center = (getattr(species, f'{env}_min') + getattr(species, f'{env}_max')) // 2
-            delta = abs(center - getattr(planet, env))
+            radius = (_max - _min) // 2
+            center = (_min + _max) // 2
+            delta = abs(center - env)
 
             if delta <= radius:  # rating is in the green
                 value += (100 - 100 * delta // radius) ** 2
@@ -25,3 +42,90 @@ def planet_value(species, planet):
     if red != 0:
         return -red
     return int(int(math.sqrt(value / 3) + 0.9) * ideal / 10000)
+
+
+def _axis_rating(immune, _min, _max, env):
+    # The contribution of a single environment to environment_value, as a tuple of
+    # (points, red, ideal numerator, ideal denominator).  None if the rating is undefined.
+    if immune:
+        return 10000, 0, 1, 1
+    radius = (_max - _min) // 2
+    delta = abs((_min + _max) // 2 - env)
+    if delta > radius:
+        return 0, min(delta - radius, 15), 1, 1
+    if radius == 0:
+        return None
+    margin = 2 * delta - radius
+    if margin > 0:
+        return (100 - 100 * delta // radius) ** 2, 0, radius * 2 - margin, radius * 2
+    return (100 - 100 * delta // radius) ** 2, 0, 1, 1
+
+
+class Habitability:
+    """Planet values for a single set of species tolerances.
+
+    Each environment is rated independently of the others, so the ratings are tabulated once per
+    environment over its whole 0..100 range, and combined on lookup.  Combined values are memoized
+    per environment triple.
+    """
+
+    def __init__(self, tolerances):
+        self.tolerances = tolerances
+        self.axes = [[_axis_rating(*tolerance, env) for env in range(101)] for tolerance in tolerances]
+        self.values = {}
+
+    def __call__(self, environment):
+        try:
+            return self.values[environment]
+        except KeyError:
+            pass
+        value = self.values[environment] = self._combine(environment)
+        return value
+
+    def _combine(self, environment):
+        ratings = []
+        for axis, env in zip(self.axes, environment):
+            rating = axis[env] if type(env) is int and 0 <= env <= 100 else None
+            if rating is None:
+                # Out of range, or undefined; leave it to the algorithm to produce the value or error.
+                return environment_value(self.tolerances, environment)
+            ratings.append(rating)
+
+        value, red, ideal = 0, 0, 10000
+        for points, lethality, numerator, denominator in ratings:
+            value += points
+            red += lethality
+            # Scaled in environment order, as environment_value does, so that the flooring matches.
+            ideal = ideal * numerator // denominator
+
+        if red != 0:
+            return -red
+        return int(int(math.sqrt(value / 3) + 0.9) * ideal / 10000)
+
+
+@functools.lru_cache(maxsize=1024)
+def habitability_table(tolerances):
+    """The shared Habitability table for a tolerances tuple, as produced by ``tolerances``.
+
+    Tables are keyed by the tolerances themselves rather than by species, so a species whose
+    tolerances change is simply served a different table.
+    """
+    return Habitability(tolerances)
+
+
+def habitability(species):
+    return habitability_table(tolerances(species))
+
+
+def planet_value(species, planet):
+    return habitability(species)(environment(planet))
+
+
+def planet_values(species, manager):
+    """The value of every planet for a species, keyed by planet pk.
+
+    Environments are read a column at a time from the manager's environment component, rather than
+    off of each planet entity.
+    """
+    _, (pks, *environments) = manager.get_columns('environment', ['pk', *ENVIRONMENTS])
+    return dict(zip(pks, map(habitability(species), zip(*environments))))
@@ -0,0 +1,118 @@
+"""Per-player views of a game state, hiding whatever a player's scanners cannot see.
+
+Every species is a player.  A player sees:
+
+    - the entities it owns, and the orders given to them
+    - any other positioned entity within scanning range of one of its ships or planets
+    - every entity that has neither a position, an owner nor an actor, such as the species themselves
+
+All of the views are built in a single pass over the entities, with each visible entity serialized
+only once and the same dict shared by every view that includes it.
+"""
+from collections import defaultdict
+
+
+# The distance in light-years at which a ship or planet sees other objects.
+SCAN_RANGE = 100
+
+
+def _offsets(scan_range, size):
+    # The offsets from a grid cell to the cells all of whose points are within range of all of its
+    # points, and to the other cells with any point in range of any of its points.
+    n = scan_range // size + 1
+    sure, near = [], []
+    for i in range(-n, n + 1):
+        for j in range(-n, n + 1):
+            closest = max(0, (abs(i) - 1) * size + 1) ** 2 + max(0, (abs(j) - 1) * size + 1) ** 2
+            farthest = ((abs(i) + 1) * size - 1) ** 2 + ((abs(j) + 1) * size - 1) ** 2
+            if farthest <= scan_range * scan_range:
+                sure.append((i, j))
+            elif closest <= scan_range * scan_range:
+                near.append((i, j))
+    return sure, near
+
+
+class _Scanners:
+    """A uniform grid of the owned positioned entities, answering which players see a point.
+
+    Cells are a quarter of the scanning range across.  A player with a scanner in a cell close
+    enough sees every point of a cell outright, so only the scanners in the ring of cells around
+    those have to be checked against each point.  The outcome is worked out once per cell.
+    """
+
+    def __init__(self, manager, owners, scan_range):
+        self.scan_range = scan_range
+        self.size = max(1, scan_range // 4)
+        self.sure, self.near = _offsets(scan_range, self.size)
+        self.cells = {}
+
+        entities, (X, Y) = manager.get_columns('position', ['x', 'y'])
+        self.grid = defaultdict(lambda: defaultdict(list))
+        for entity, x, y in zip(entities, X, Y):
+            owner = owners.get(entity.pk)
+            if owner is not None:
+                self.grid[x // self.size, y // self.size][owner].append((x, y))
+
+    def _cell(self, column, row):
+        grid, sure, candidates = self.grid, set(), defaultdict(list)
+        for i, j in self.sure:
+            cell = grid.get((column + i, row + j))
+            if cell is not None:
+                sure.update(cell)
+        for i, j in self.near:
+            cell = grid.get((column + i, row + j))
+            if cell is not None:
+                for owner, positions in cell.items():
+                    if owner not in sure:
+                        candidates[owner].extend(positions)
+        return sure, list(candidates.items())
+
+    def viewers(self, x, y):
+        key = (x // self.size, y // self.size)
+        cell = self.cells.get(key)
+        if cell is None:
+            cell = self.cells[key] = self._cell(*key)
+        sure, candidates = cell
+
+        viewers, limit = set(sure), self.scan_range * self.scan_range
+        for owner, positions in candidates:
+            for x_s, y_s in positions:
+                if (x - x_s) * (x - x_s) + (y - y_s) * (y - y_s) <= limit:
+                    viewers.add(owner)
+                    break
+        return viewers
+
+
+def generate(manager, scan_range=SCAN_RANGE):
+    """Return the serialized entities visible to each player, keyed by the species' pk.
+
+    Entities keep the order export_entities gives them in.  The serialized entities are shared
+    between the views, so they must be copied before being modified.
+    """
+    players = sorted(manager.get_pks('species'))
+    entities, (owner_ids,) = manager.get_columns('ownership', ['owner_id'])
+    owners = {entity.pk: owner for entity, owner in zip(entities, owner_ids)}
+    scanners = _Scanners(manager, owners, scan_range)
+    positioned = manager.get_entities('position')
+
+    views = {player: [] for player in players}
+    for pk, entity in manager.get_entities('metadata').items():
+        if pk in owners or pk in positioned:
+            viewers = scanners.viewers(entity.x, entity.y) if pk in positioned else set()
+            owner = owners.get(pk)
+            if owner is not None:
+                viewers.add(owner)
+        elif getattr(entity, 'actor_id', None) is not None:
+            viewers = {owners.get(entity.actor_id)}
+        else:
+            viewers = views.keys()
+
+        data = None
+        for player in viewers:
+            view = views.get(player)
+            if view is None:
+                continue
+            if data is None:
+                data = entity.serialize()
+            view.append(data)
+    return views